@@ -4,13 +4,37 @@ Professional BMW / Mercedes / Audi / VW Key Programming Reference
 Matching CyberNinja Cluster ID aesthetic
 """
 
-import tkinter as tk
-from tkinter import ttk, messagebox, filedialog
+# First, so the startup clock covers every import below
+from keyintel_launch import elapsed_ms, ensure_dependencies
+
+if __name__ == "__main__":
+    # Before the GUI imports, so a missing package gets installed instead of crashing
+    ensure_dependencies()
+
+from tkinter import messagebox, filedialog
 import customtkinter as ctk
-import json
 import os
-from pathlib import Path
-from PIL import Image, ImageTk
+import queue
+import sys
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from keyintel_brands import BRAND_FILES, HEADER_LABELS, STATS_LABELS
+from keyintel_engine import create_engine, KEY_STATUS_MAP
+from keyintel_reload import BrandWatcher, describe as describe_reload
+import keyintel_trace as trace
+from keyintel_typeahead import query_year
+from keyintel_vin import decode_vin
+from keyintel_images import (
+    ImageIndex, image_stem, load_thumbnail, save_reference_image, THUMB_SIZE
+)
+from keyintel_format import (
+    CYBER_CYAN, CYBER_GREEN, CYBER_MAGENTA, CYBER_DARK, CYBER_PANEL,
+    CYBER_ACCENT, CYBER_RED, CYBER_YELLOW, CYBER_ORANGE, CYBER_BLUE,
+    TEXT_DEFAULT, RISK_NONE, MENU_FIRST_YEAR, MENU_LAST_YEAR
+)
 
 # ==========================
 # CyberNinja Theme Settings
@@ -18,23 +42,30 @@ from PIL import Image, ImageTk
 ctk.set_appearance_mode("dark")
 ctk.set_default_color_theme("blue")
 
-# Custom colors - matching Cluster ID
-CYBER_CYAN = "#00ffff"
-CYBER_GREEN = "#00ff00"
-CYBER_MAGENTA = "#ff00ff"
-CYBER_DARK = "#0a0a0f"
-CYBER_PANEL = "#12121a"
-CYBER_ACCENT = "#00ffcc"
-CYBER_RED = "#ff0066"
-CYBER_YELLOW = "#ffcc00"
-CYBER_ORANGE = "#ff9900"
-CYBER_BLUE = "#0099ff"
-
-# Risk colors
-RISK_LOW = "#00ff00"
-RISK_MEDIUM = "#ffcc00"
-RISK_HIGH = "#ff6600"
-RISK_VERY_HIGH = "#ff0066"
+# Colors live in keyintel_format so headless callers share them
+
+# Quiet period after the last VIN keystroke before decoding. Barcode
+# scanners type all 17 characters well inside this window.
+VIN_DEBOUNCE_MS = 250
+
+# Reference image loading: how often to check the worker, how many ready
+# images to keep in memory
+IMAGE_POLL_MS = 30
+IMAGE_CACHE_SIZE = 64
+
+# Most search matches listed in the results menu
+SEARCH_MAX_RESULTS = 50
+
+QUICK_FIND_PROMPT = "Type to find a vehicle"
+
+# How often finished brand hot reloads are picked up on the UI thread
+RELOAD_POLL_MS = 500
+
+# How often the UI checks for brands finished by the startup loader
+BRAND_POLL_MS = 30
+
+# Diagnostics window refresh (only exists with KEYINTEL_TRACE=1)
+DIAGNOSTICS_REFRESH_MS = 1000
 
 
 class LuxuryKeyIntel(ctk.CTk):
@@ -45,6 +76,10 @@ class LuxuryKeyIntel(ctk.CTk):
         self.minsize(1300, 850)
         self.configure(fg_color=CYBER_DARK)
 
+        # Startup timings in ms since launch; first_paint_ms lands once the window is drawn
+        self.startup_stats = {"imports_ms": elapsed_ms()}
+        self.report_startup = False
+
         # Database & folders
         self.db_folder = "data"
         self.images_dir = "Key_Images"
@@ -52,155 +87,134 @@ class LuxuryKeyIntel(ctk.CTk):
         os.makedirs(self.db_folder, exist_ok=True)
         os.makedirs(self.images_dir, exist_ok=True)
         
-        self.load_databases()
+        # Filled in by the loader thread after the window is up
+        self.engine = None
+        self.ready_makes = []
+        self.brand_queue = queue.Queue()
+        self._pending_vin_make = None
         self.current_image = None
+        self._vin_after_id = None
+        self._last_vin = ""
+        self._quick_session = None
+
+        # Last options applied per widget, so renders only touch what changed
+        self._label_state = {}
+        self._image_key = None
+        self.render_stats = {
+            "renders": 0, "last_ms": 0.0, "total_ms": 0.0, "max_ms": 0.0,
+            "labels_updated": 0, "labels_skipped": 0
+        }
+
+        # Reference images: folder index, background thumbnailing, ready-image LRU
+        self.image_index = ImageIndex(self.images_dir)
+        self.image_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="keyintel-img")
+        self.image_cache = OrderedDict()
+        self._image_request = None
         
         self.build_ui()
+        self.startup_stats["build_ui_ms"] = elapsed_ms()
+        self.bind("<Map>", self.on_first_map, add="+")
+
+        # Hot reload: the watcher re-parses changed brand files on its own
+        # thread; results are applied here via after()
+        self.reload_results = queue.Queue()
+        self.watcher = None
+
+        # Brands load on a worker and stream in through poll_brand_loading,
+        # so the window paints before any JSON is parsed
+        threading.Thread(target=self.load_databases, name="keyintel-load", daemon=True).start()
+        self.after(BRAND_POLL_MS, self.poll_brand_loading)
 
     # =======================
-    # Database Handling
+    # Engine Delegation
     # =======================
     def load_databases(self):
-        """Load all brand JSON databases"""
-        self.bmw_data = self.load_json("bmw.json")
-        self.benz_data = self.load_json("benz.json")
-        self.audi_data = self.load_json("audi.json")
-        self.vw_data = self.load_json("vw.json")  # Added VW
-
-    def load_json(self, filename):
-        """Load a JSON file, return empty dict if not found"""
-        path = os.path.join(self.db_folder, filename)
-        if os.path.exists(path):
+        """Open the engine and load each brand in turn (runs on the loader thread)
+
+        Progress goes to brand_queue as ("engine", engine), ("brand", make)
+        per brand in whatever order they finish, then ("done", None) or
+        ("error", message); nothing here touches Tk. KEYINTEL_BACKEND=sqlite
+        for the SQLite backend; KEYINTEL_MATRIX=1 to precompute every menu
+        combination (json backend).
+        """
+        try:
+            backend = os.environ.get("KEYINTEL_BACKEND", "json")
+            engine = create_engine(self.db_folder, backend)
+            self.brand_queue.put(("engine", engine))
+            announce = lambda make: self.brand_queue.put(("brand", make))
+            if hasattr(engine, "load_brands"):
+                # Brand files parse in parallel; each is announced as it lands
+                engine.load_brands(on_ready=announce)
+            else:
+                for make in BRAND_FILES:
+                    announce(make)
+            if backend == "json":
+                # Build the quick-find index here rather than on the first keystroke.
+                # SQLite builds it on first use, so startup memory stays flat.
+                engine.typeahead
+                if os.environ.get("KEYINTEL_MATRIX") == "1":
+                    engine.build_matrix()
+            self.brand_queue.put(("done", None))
+        except Exception as e:
+            self.brand_queue.put(("error", str(e)))
+
+    def poll_brand_loading(self):
+        """Apply loader progress on the Tk thread"""
+        while True:
             try:
-                with open(path, "r", encoding="utf-8") as f:
-                    return json.load(f)
-            except:
-                return {}
-        return {}
+                kind, value = self.brand_queue.get_nowait()
+            except queue.Empty:
+                break
+            if kind == "engine":
+                self.engine = value
+            elif kind == "brand":
+                self.on_brand_ready(value)
+            elif kind == "done":
+                self.on_brands_loaded()
+                return
+            else:
+                self.reload_label.configure(text=f"⚠ Database load failed: {value}", text_color=CYBER_RED)
+                return
+        self.after(BRAND_POLL_MS, self.poll_brand_loading)
+
+    def on_brand_ready(self, make):
+        """A brand finished loading: offer it in the make menu and the stats"""
+        self.ready_makes.append(make)
+        # Menu keeps registry order however the loads interleave
+        self.ready_makes.sort(key=list(BRAND_FILES).index)
+        self.make_menu.configure(values=["Select Make"] + self.ready_makes)
+        self.refresh_stats()
+        if self._pending_vin_make == make:
+            # A VIN for this brand arrived early; decode it again now
+            self._pending_vin_make = None
+            self._last_vin = ""
+            self.process_vin()
+
+    def on_brands_loaded(self):
+        self.startup_stats["databases_ms"] = elapsed_ms()
+        load_errors = getattr(self.engine, "load_errors", {})
+        if load_errors:
+            self.reload_label.configure(
+                text="\n".join(f"⚠ {error}" for error in load_errors.values()),
+                text_color=CYBER_RED
+            )
+        if hasattr(self.engine, "reload_brand"):
+            self.watcher = BrandWatcher(self.engine, on_reload=self.reload_results.put).start()
+            self.after(RELOAD_POLL_MS, self.poll_reloads)
 
     def get_models_for_make(self, make):
         """Get available models for a make"""
-        if make == "BMW":
-            return sorted(self.bmw_data.get("BMW", {}).keys())
-        elif make == "Mercedes-Benz":
-            return sorted(self.benz_data.get("Mercedes-Benz", {}).keys())
-        elif make == "Audi":
-            return sorted(self.audi_data.get("Audi", {}).keys())
-        elif make == "Volkswagen":
-            return sorted(self.vw_data.get("Volkswagen", {}).keys())
-        return []
+        return self.engine.get_models_for_make(make)
 
     def resolve_vehicle(self, make, model, year, key_status):
         """Resolve vehicle data from database"""
-        if make == "BMW":
-            brand_data = self.bmw_data.get("BMW", {})
-        elif make == "Mercedes-Benz":
-            brand_data = self.benz_data.get("Mercedes-Benz", {})
-        elif make == "Audi":
-            brand_data = self.audi_data.get("Audi", {})
-        elif make == "Volkswagen":
-            brand_data = self.vw_data.get("Volkswagen", {})
-        else:
-            return None
+        return self.engine.resolve_vehicle(make, model, year, key_status)
 
-        model_data = brand_data.get(model)
-        if not model_data:
-            return None
-
-        for year_range, info in model_data.items():
-            try:
-                start, end = map(int, year_range.split("-"))
-                if start <= year <= end:
-                    eeprom_info = info.get("eeprom_info", {})
-                    xhorse_info = info.get("xhorse_tool_support", {})
-                    return {
-                        "platform": info.get("platform", "Unknown"),
-                        "immobilizer": info.get("immobilizer", "Unknown"),
-                        "key_type": info.get("key_type", "Unknown"),
-                        "key_blade": info.get("key_blade", "Unknown"),
-                        "programming": info.get("programming", {}).get(key_status, "Unknown"),
-                        "module_removal": "Yes" if info.get("module_removal", {}).get(key_status, False) else "No",
-                        "akl_supported": info.get("akl_supported", "Unknown"),
-                        "risk_level": info.get("risk_level", "Unknown"),
-                        "eeprom_chip": eeprom_info.get("chip_type", "N/A"),
-                        "backup_method": eeprom_info.get("backup_method", "Standard OBD backup"),
-                        "backup_required": eeprom_info.get("backup_required", False),
-                        "backup_warning": eeprom_info.get("warning", ""),
-                        "notes": info.get("notes", "No additional notes"),
-                        "year_range": year_range,
-                        # Xhorse tool support
-                        "mlb_tool": xhorse_info.get("mlb_tool", False),
-                        "mqb_adapter": xhorse_info.get("mqb_adapter", False),
-                        "xhorse_notes": xhorse_info.get("mlb_notes", xhorse_info.get("adapter_notes", xhorse_info.get("notes", ""))),
-                        "xhorse_workflow": xhorse_info.get("workflow", ""),
-                        "recommended_tool": xhorse_info.get("recommended_tool", "")
-                    }
-            except:
-                continue
-        return None
-
-    # =======================
-    # VIN Tools
-    # =======================
     def validate_vin(self, vin):
-        """Validate VIN and extract info"""
-        if not vin:
-            return {"valid": False, "message": ""}
-        
-        vin = vin.upper().strip()
-        
-        if len(vin) != 17:
-            return {"valid": False, "message": f"Need 17 chars (got {len(vin)})"}
-        
-        invalid = [c for c in vin if c in "IOQ"]
-        if invalid:
-            return {"valid": False, "message": f"Invalid: {', '.join(invalid)}"}
-        
-        if not vin.isalnum():
-            return {"valid": False, "message": "Must be alphanumeric"}
-        
-        # WMI decode - added VW
-        wmi = vin[:3]
-        wmi_map = {
-            "WBA": "BMW (Germany)", "WBS": "BMW M", "WBY": "BMW i",
-            "4US": "BMW (USA)", "5UX": "BMW X (USA)", "5YM": "BMW M (USA)",
-            "WDB": "Mercedes-Benz", "WDC": "Mercedes SUV", "WDD": "Mercedes",
-            "4JG": "Mercedes (USA)", "55S": "AMG",
-            "WAU": "Audi", "WUA": "Audi Quattro", "TRU": "Audi (Hungary)",
-            # VW WMI codes
-            "WVW": "Volkswagen (Germany)", "WVG": "VW SUV (Germany)",
-            "3VW": "VW (Mexico)", "1VW": "VW (USA)",
-            "9BW": "VW (Brazil)", "AAV": "VW (Argentina)"
-        }
-        manufacturer = wmi_map.get(wmi, "Unknown")
-        
-        # Year decode
-        year_codes = {
-            "A": 2010, "B": 2011, "C": 2012, "D": 2013, "E": 2014,
-            "F": 2015, "G": 2016, "H": 2017, "J": 2018, "K": 2019,
-            "L": 2020, "M": 2021, "N": 2022, "P": 2023, "R": 2024,
-            "S": 2025, "T": 2026
-        }
-        year = year_codes.get(vin[9], None)
-        
-        # Detect make
-        make = None
-        if wmi in ["WBA", "WBS", "WBY", "4US", "5UX", "5YM"]:
-            make = "BMW"
-        elif wmi in ["WDB", "WDC", "WDD", "4JG", "55S"]:
-            make = "Mercedes-Benz"
-        elif wmi in ["WAU", "WUA", "TRU"]:
-            make = "Audi"
-        elif wmi in ["WVW", "WVG", "3VW", "1VW", "9BW", "AAV"]:
-            make = "Volkswagen"
-        
-        return {
-            "valid": True,
-            "message": f"✓ {manufacturer}",
-            "manufacturer": manufacturer,
-            "year": year,
-            "make": make
-        }
+        """Validate VIN and extract info (works before any brand has loaded)"""
+        if self.engine is None:
+            return decode_vin(vin)
+        return self.engine.validate_vin(vin)
 
     # =======================
     # UI Building
@@ -223,7 +237,7 @@ class LuxuryKeyIntel(ctk.CTk):
 
         ctk.CTkLabel(
             title_frame,
-            text="BMW • MERCEDES • AUDI • VW",
+            text=" • ".join(HEADER_LABELS.values()),
             font=("Consolas", 14),
             text_color=CYBER_MAGENTA
         ).pack(side="left", padx=20)
@@ -249,6 +263,39 @@ class LuxuryKeyIntel(ctk.CTk):
         sep1 = ctk.CTkFrame(left_panel, fg_color=CYBER_CYAN, height=2)
         sep1.pack(fill="x", padx=20, pady=10)
 
+        # Quick find - type-ahead over make, model, platform and years
+        ctk.CTkLabel(left_panel, text="Quick Find (model, platform, year):", font=("Consolas", 12, "bold"),
+                     text_color=CYBER_ACCENT).pack(anchor="w", padx=25, pady=(5, 5))
+        self.quick_entry = ctk.CTkEntry(
+            left_panel,
+            width=260,
+            height=32,
+            font=("Consolas", 11),
+            placeholder_text="e.g. G05 or X5 2020  [Enter]",
+            fg_color="#1a1a2e",
+            border_color=CYBER_CYAN
+        )
+        self.quick_entry.pack(padx=25)
+        self.quick_entry.bind("<KeyRelease>", self.on_quick_find_changed)
+        self.quick_entry.bind("<Return>", self.on_quick_find_submitted)
+
+        self.quick_hits = {}
+        self.quick_var = ctk.StringVar(value=QUICK_FIND_PROMPT)
+        self.quick_menu = ctk.CTkOptionMenu(
+            left_panel,
+            variable=self.quick_var,
+            values=[QUICK_FIND_PROMPT],
+            width=260,
+            height=32,
+            font=("Consolas", 10),
+            fg_color="#1a1a2e",
+            button_color=CYBER_MAGENTA,
+            button_hover_color=CYBER_CYAN,
+            dropdown_fg_color=CYBER_PANEL,
+            command=self.on_quick_find_selected
+        )
+        self.quick_menu.pack(padx=25, pady=(5, 0))
+
         # Make - Added Volkswagen
         ctk.CTkLabel(left_panel, text="Make:", font=("Consolas", 12, "bold"),
                      text_color=CYBER_ACCENT).pack(anchor="w", padx=25, pady=(15, 5))
@@ -256,7 +303,7 @@ class LuxuryKeyIntel(ctk.CTk):
         self.make_menu = ctk.CTkOptionMenu(
             left_panel,
             variable=self.make_var,
-            values=["Select Make", "BMW", "Mercedes-Benz", "Audi", "Volkswagen"],
+            values=["Select Make"],
             width=260,
             height=40,
             font=("Consolas", 12),
@@ -291,7 +338,8 @@ class LuxuryKeyIntel(ctk.CTk):
         ctk.CTkLabel(left_panel, text="Year:", font=("Consolas", 12, "bold"),
                      text_color=CYBER_ACCENT).pack(anchor="w", padx=25, pady=(15, 5))
         self.year_var = ctk.StringVar(value="Select Year")
-        years = ["Select Year"] + [str(y) for y in range(2026, 2004, -1)]
+        years = ["Select Year"] + [str(y) for y in range(MENU_LAST_YEAR, MENU_FIRST_YEAR - 1, -1)]
+        self.year_values = set(years[1:])
         self.year_menu = ctk.CTkOptionMenu(
             left_panel,
             variable=self.year_var,
@@ -321,6 +369,7 @@ class LuxuryKeyIntel(ctk.CTk):
         )
         self.vin_entry.pack(padx=25)
         self.vin_entry.bind("<KeyRelease>", self.on_vin_changed)
+        self.vin_entry.bind("<Return>", self.on_vin_submitted)
 
         # VIN Status
         self.vin_status_label = ctk.CTkLabel(
@@ -350,6 +399,38 @@ class LuxuryKeyIntel(ctk.CTk):
         )
         self.key_status_menu.pack(padx=25)
 
+        # Search - blade, chip, platform, notes...
+        ctk.CTkLabel(left_panel, text="Search (blade, chip, notes):", font=("Consolas", 12, "bold"),
+                     text_color=CYBER_ACCENT).pack(anchor="w", padx=25, pady=(15, 5))
+        self.search_entry = ctk.CTkEntry(
+            left_panel,
+            width=260,
+            height=32,
+            font=("Consolas", 11),
+            placeholder_text="e.g. HU100R 95256  [Enter]",
+            fg_color="#1a1a2e",
+            border_color=CYBER_CYAN
+        )
+        self.search_entry.pack(padx=25)
+        self.search_entry.bind("<Return>", self.on_search)
+
+        self.search_hits = {}
+        self.search_var = ctk.StringVar(value="No search")
+        self.search_menu = ctk.CTkOptionMenu(
+            left_panel,
+            variable=self.search_var,
+            values=["No search"],
+            width=260,
+            height=32,
+            font=("Consolas", 10),
+            fg_color="#1a1a2e",
+            button_color=CYBER_MAGENTA,
+            button_hover_color=CYBER_CYAN,
+            dropdown_fg_color=CYBER_PANEL,
+            command=self.on_search_result_selected
+        )
+        self.search_menu.pack(padx=25, pady=(5, 0))
+
         # Separator
         sep2 = ctk.CTkFrame(left_panel, fg_color=CYBER_MAGENTA, height=2)
         sep2.pack(fill="x", padx=20, pady=25)
@@ -361,19 +442,38 @@ class LuxuryKeyIntel(ctk.CTk):
         ctk.CTkLabel(self.stats_frame, text="📊 DATABASE STATS",
                      font=("Consolas", 11, "bold"), text_color=CYBER_CYAN).pack(pady=10)
 
-        bmw_count = len(self.bmw_data.get("BMW", {}))
-        audi_count = len(self.audi_data.get("Audi", {}))
-        vw_count = len(self.vw_data.get("Volkswagen", {}))
-        benz_count = len(self.benz_data.get("Mercedes-Benz", {}))
-        
         self.stat_label = ctk.CTkLabel(
             self.stats_frame,
-            text=f"BMW Models: {bmw_count}\nAudi Models: {audi_count}\nVW Models: {vw_count}\nMercedes: {benz_count if benz_count > 0 else 'Coming Soon'}",
+            text="",
             font=("Consolas", 10),
             text_color=CYBER_ACCENT,
             justify="left"
         )
         self.stat_label.pack(pady=(0, 10))
+        self.refresh_stats()
+
+        # Brand load / hot reload status
+        self.reload_label = ctk.CTkLabel(
+            self.stats_frame,
+            text="",
+            font=("Consolas", 9),
+            text_color="#666",
+            justify="left",
+            wraplength=240
+        )
+        self.reload_label.pack(pady=(0, 10))
+        if trace.ENABLED:
+            ctk.CTkButton(
+                self.stats_frame,
+                text="📈 Diagnostics",
+                width=160,
+                height=28,
+                font=("Consolas", 10, "bold"),
+                fg_color="#1a1a2e",
+                hover_color=CYBER_MAGENTA,
+                command=self.open_diagnostics
+            ).pack(pady=(0, 10))
+            self.diagnostics_window = None
 
         # Credits at bottom
         ctk.CTkLabel(
@@ -444,7 +544,7 @@ class LuxuryKeyIntel(ctk.CTk):
                 card,
                 text="—",
                 font=("Consolas", 13),
-                text_color="#e6e6e6",
+                text_color=TEXT_DEFAULT,
                 wraplength=400,
                 justify="left"
             )
@@ -495,7 +595,8 @@ class LuxuryKeyIntel(ctk.CTk):
             value="Module",
             font=("Consolas", 10),
             fg_color=CYBER_MAGENTA,
-            hover_color=CYBER_CYAN
+            hover_color=CYBER_CYAN,
+            command=self.on_selection_changed
         ).pack(side="left", padx=10)
 
         ctk.CTkRadioButton(
@@ -505,7 +606,8 @@ class LuxuryKeyIntel(ctk.CTk):
             value="Key",
             font=("Consolas", 10),
             fg_color=CYBER_MAGENTA,
-            hover_color=CYBER_CYAN
+            hover_color=CYBER_CYAN,
+            command=self.on_selection_changed
         ).pack(side="left", padx=10)
 
         # Add image button
@@ -573,6 +675,89 @@ class LuxuryKeyIntel(ctk.CTk):
         )
         self.risk_text.pack(pady=(5, 10))
 
+    def refresh_stats(self):
+        counts = self.engine.model_counts() if self.engine is not None else {}
+
+        lines = []
+        for make, label in STATS_LABELS.items():
+            if make not in self.ready_makes:
+                lines.append(f"{label}: loading...")
+            else:
+                lines.append(f"{label}: {counts.get(make, 0) or 'Coming Soon'}")
+        self.stat_label.configure(text="\n".join(lines))
+
+    def on_first_map(self, event):
+        if event.widget is not self or "first_paint_ms" in self.startup_stats:
+            return
+        # Flush the pending redraws so the number covers the first full paint
+        self.update_idletasks()
+        self.startup_stats["first_paint_ms"] = elapsed_ms()
+        if self.report_startup or trace.ENABLED:
+            print("Startup: " + ", ".join(f"{name} {ms:.0f}" for name, ms in self.startup_stats.items()),
+                  file=sys.stderr)
+        if self.report_startup:
+            self.after(0, self.destroy)
+
+    # =======================
+    # Diagnostics (KEYINTEL_TRACE=1)
+    # =======================
+    def open_diagnostics(self):
+        """Span latencies and cache counters, refreshed while the window is open"""
+        if self.diagnostics_window is not None and self.diagnostics_window.winfo_exists():
+            self.diagnostics_window.focus()
+            return
+        window = ctk.CTkToplevel(self)
+        window.title("KeyIntel Diagnostics")
+        window.geometry("560x460")
+        window.configure(fg_color=CYBER_DARK)
+        self.diagnostics_window = window
+
+        self.diagnostics_text = ctk.CTkLabel(
+            window, text="", font=("Consolas", 11), text_color=CYBER_ACCENT,
+            justify="left", anchor="nw"
+        )
+        self.diagnostics_text.pack(fill="both", expand=True, padx=15, pady=15)
+
+        buttons = ctk.CTkFrame(window, fg_color="transparent")
+        buttons.pack(pady=(0, 15))
+        for text, fmt in (("Export JSON", "json"), ("Export Chrome Trace", "chrome")):
+            ctk.CTkButton(
+                buttons, text=text, width=170, height=30, font=("Consolas", 10, "bold"),
+                fg_color=CYBER_MAGENTA, hover_color=CYBER_CYAN,
+                command=lambda fmt=fmt: self.export_trace(fmt)
+            ).pack(side="left", padx=5)
+        self.refresh_diagnostics()
+
+    def refresh_diagnostics(self):
+        if self.diagnostics_window is None or not self.diagnostics_window.winfo_exists():
+            return
+        lines = [f"{'span':<22}{'calls':>7}{'p50 ms':>10}{'p95 ms':>10}{'max ms':>10}"]
+        for name, stats in trace.summary().items():
+            lines.append(f"{name:<22}{stats['count']:>7}{stats['p50_ms']:>10.2f}"
+                         f"{stats['p95_ms']:>10.2f}{stats['max_ms']:>10.2f}")
+        lines.append("")
+        for name, ms in self.startup_stats.items():
+            lines.append(f"{'startup ' + name:<32}{ms:>10.0f}")
+        for name, value in sorted(trace.counters().items()):
+            lines.append(f"{name:<32}{value:>10}")
+        stats = self.render_stats
+        lines.append(f"{'labels updated / skipped':<32}{stats['labels_updated']:>5} / {stats['labels_skipped']}")
+        self.diagnostics_text.configure(text="\n".join(lines))
+        self.after(DIAGNOSTICS_REFRESH_MS, self.refresh_diagnostics)
+
+    def export_trace(self, fmt):
+        path = filedialog.asksaveasfilename(
+            title="Export diagnostics",
+            defaultextension=".json",
+            initialfile="keyintel_trace.json" if fmt == "json" else "keyintel_chrome_trace.json",
+            filetypes=[("JSON", "*.json")]
+        )
+        if path:
+            try:
+                trace.write(path, fmt)
+            except OSError as e:
+                messagebox.showerror("Error", f"Could not export diagnostics:\n{e}")
+
     # =======================
     # Event Handlers
     # =======================
@@ -586,47 +771,212 @@ class LuxuryKeyIntel(ctk.CTk):
         self.model_var.set("Select Model")
         self.clear_results()
 
+    def poll_reloads(self):
+        """Apply brand reloads finished by the watcher"""
+        reloaded = set()
+        while True:
+            try:
+                result = self.reload_results.get_nowait()
+            except queue.Empty:
+                break
+            self.reload_label.configure(
+                text=describe_reload(result),
+                text_color="#666" if result["ok"] else CYBER_RED
+            )
+            if result["ok"]:
+                reloaded.add(result["make"])
+
+        if reloaded:
+            self.refresh_stats()
+            make = self.make_var.get()
+            if make in reloaded:
+                # Keep the current selection if the model is still there
+                models = self.get_models_for_make(make)
+                self.model_menu.configure(values=["Select Model"] + (models or ["No data available"]))
+                if self.model_var.get() not in models:
+                    self.model_var.set("Select Model")
+                    self.clear_results()
+                else:
+                    self.update_results()
+        self.after(RELOAD_POLL_MS, self.poll_reloads)
+
     def on_selection_changed(self, *args):
         """Update results when any selection changes"""
         self.update_results()
 
+    def on_search(self, event=None):
+        """Run a full-text search and list the matches"""
+        query = self.search_entry.get().strip()
+        if not query:
+            return
+        if len(self.ready_makes) < len(BRAND_FILES):
+            self.search_var.set("Still loading brands...")
+            return
+        hits = self.engine.search(query, limit=SEARCH_MAX_RESULTS)
+        self.search_hits = {
+            f"{make} {model} {year_range}": (make, model, start, end)
+            for make, model, year_range, start, end, _info in hits
+        }
+        if self.search_hits:
+            labels = list(self.search_hits)
+            self.search_menu.configure(values=labels)
+            self.search_var.set(f"{len(labels)} match(es) - pick one")
+        else:
+            self.search_menu.configure(values=["No matches"])
+            self.search_var.set("No matches")
+
+    def on_search_result_selected(self, choice):
+        """Jump to the vehicle picked from the search results"""
+        hit = self.search_hits.get(choice)
+        if hit:
+            self.select_vehicle(*hit)
+
+    @trace.traced("quick_find")
+    def on_quick_find_changed(self, event=None):
+        """Refilter the quick-find matches on every keystroke"""
+        if self.engine is None or len(self.ready_makes) < len(BRAND_FILES):
+            self.quick_var.set("Still loading brands...")
+            return
+        index = self.engine.typeahead
+        if self._quick_session is None or self._quick_session.index is not index:
+            # First use, or a hot reload rebuilt the index
+            self._quick_session = index.session()
+        query = self.quick_entry.get()
+        hits = self._quick_session.update(query)
+        self.quick_hits = {}
+        for make, model, year_range, start, end, platform in hits:
+            year = query_year(query, start, end)
+            label = f"{make} {model} {year or year_range} - {platform}"
+            self.quick_hits[label] = (make, model, start, end, year)
+        if self.quick_hits:
+            self.quick_menu.configure(values=list(self.quick_hits))
+            self.quick_var.set(f"{len(self._quick_session.candidates)} match(es) - pick one")
+        elif query.strip():
+            self.quick_menu.configure(values=["No matches"])
+            self.quick_var.set("No matches")
+        else:
+            self.quick_menu.configure(values=[QUICK_FIND_PROMPT])
+            self.quick_var.set(QUICK_FIND_PROMPT)
+
+    def on_quick_find_submitted(self, event=None):
+        """Enter takes the best quick-find match"""
+        self.on_quick_find_changed()
+        if self.quick_hits:
+            self.select_vehicle(*next(iter(self.quick_hits.values())))
+
+    def on_quick_find_selected(self, choice):
+        hit = self.quick_hits.get(choice)
+        if hit:
+            self.select_vehicle(*hit)
+
+    def select_vehicle(self, make, model, start, end, year=None):
+        """Select make/model and a year: the given one, else the first of the range the year menu offers"""
+        if make != self.make_var.get():
+            self.make_var.set(make)
+            self.on_make_changed(make)
+        self.model_var.set(model)
+        if year is not None and str(year) in self.year_values:
+            self.year_var.set(str(year))
+            self.update_results()
+            return
+        year = self.year_var.get()
+        if not (year.isdigit() and start <= int(year) <= end):
+            for y in range(start, end + 1):
+                if str(y) in self.year_values:
+                    self.year_var.set(str(y))
+                    break
+        self.update_results()
+
     def on_vin_changed(self, event=None):
-        """Handle VIN input changes"""
+        """Restart the debounce timer on every VIN keystroke"""
+        if self._vin_after_id is not None:
+            self.after_cancel(self._vin_after_id)
+        self._vin_after_id = self.after(VIN_DEBOUNCE_MS, self.process_vin)
+
+    def on_vin_submitted(self, event=None):
+        """Scanner sent Enter - decode now instead of waiting out the debounce"""
+        if self._vin_after_id is not None:
+            self.after_cancel(self._vin_after_id)
+        self.process_vin()
+
+    @trace.traced("process_vin")
+    def process_vin(self):
+        """Decode the settled VIN and auto-fill make and year"""
+        self._vin_after_id = None
         vin = self.vin_entry.get()
-        result = self.validate_vin(vin)
-        
+        if vin == self._last_vin:
+            return
+        self._last_vin = vin
+
         if not vin:
             self.vin_status_label.configure(text="", text_color=CYBER_ACCENT)
             return
-        
-        if result["valid"]:
-            year_text = f" | Year: {result['year']}" if result.get('year') else ""
-            self.vin_status_label.configure(
-                text=f"{result['message']}{year_text}",
-                text_color=CYBER_GREEN
-            )
-            # Auto-select make if detected
-            if result.get("make"):
-                self.make_var.set(result["make"])
-                self.on_make_changed(result["make"])
-        else:
+
+        result = self.validate_vin(vin)
+        if not result["valid"]:
             self.vin_status_label.configure(
                 text=f"✗ {result['message']}",
                 text_color=CYBER_RED
             )
+            return
+
+        year_text = f" | Year: {result['year']}" if result.get('year') else ""
+        self.vin_status_label.configure(
+            text=f"{result['message']}{year_text}",
+            text_color=CYBER_GREEN
+        )
+
+        # Brand still loading: finish this VIN when on_brand_ready gets it
+        make = result.get("make")
+        if make and make not in self.ready_makes:
+            self._pending_vin_make = make
+            self.vin_status_label.configure(
+                text=f"{result['message']}{year_text} | loading {make} data...",
+                text_color=CYBER_YELLOW
+            )
+            return
+        self._pending_vin_make = None
+
+        # Auto-select make if detected; only rebuild the model list on change
+        if make and make != self.make_var.get():
+            self.make_var.set(make)
+            self.on_make_changed(make)
+
+        # Auto-select year if it is in the menu
+        year = result.get("year")
+        if year and str(year) in self.year_values and str(year) != self.year_var.get():
+            self.year_var.set(str(year))
+
+        if make:
+            self.update_results()
+
+    # =======================
+    # Results Rendering
+    # =======================
+    def set_label(self, label, **options):
+        """Configure a widget only with the options that actually changed"""
+        last = self._label_state.setdefault(label, {})
+        changed = {k: v for k, v in options.items() if last.get(k) != v}
+        if changed:
+            label.configure(**changed)
+            last.update(changed)
+            self.render_stats["labels_updated"] += 1
+        else:
+            self.render_stats["labels_skipped"] += 1
 
     def clear_results(self):
         """Clear all result fields"""
         for label in self.result_labels.values():
-            label.configure(text="—", text_color="#e6e6e6")
-        self.risk_bar.set(0)
-        self.risk_text.configure(text="—", text_color=CYBER_GREEN)
-        self.quick_info_text.configure(text="Select a vehicle\nto see quick tips")
+            self.set_label(label, text="—", text_color=TEXT_DEFAULT)
+        self.update_risk_bar(*RISK_NONE)
+        self.set_label(self.quick_info_text, text="Select a vehicle\nto see quick tips")
+        self._image_key = None
         self.image_label.configure(
             text="No Image\n\n📷\n\nSelect vehicle to\nload reference",
             image=None
         )
 
+    @trace.traced("update_results")
     def update_results(self):
         """Resolve and display vehicle data"""
         make = self.make_var.get()
@@ -636,173 +986,127 @@ class LuxuryKeyIntel(ctk.CTk):
 
         if "Select" in make or "Select" in model or "Select" in year_text:
             return
+        if make not in self.ready_makes:
+            return
 
         try:
             year = int(year_text)
         except:
             return
 
-        key_map = {
-            "Has Working Key": "has_key",
-            "Only 1 Key": "one_key",
-            "AKL (All Keys Lost)": "akl"
-        }
-        key_status = key_map.get(key_status_ui, "has_key")
+        key_status = KEY_STATUS_MAP.get(key_status_ui, "has_key")
 
-        result = self.resolve_vehicle(make, model, year, key_status)
+        start = time.perf_counter()
+        resolved = self.engine.resolve_display(make, model, year, key_status)
 
-        if not result:
+        if not resolved:
             self.clear_results()
-            self.result_labels["Notes"].configure(
+            self.set_label(
+                self.result_labels["Notes"],
                 text="No data available for this vehicle configuration.",
                 text_color=CYBER_YELLOW
             )
+            self.record_render_time(start)
             return
 
-        # Build Xhorse tool support text
-        xhorse_tools_text = ""
-        mlb = result.get("mlb_tool", False)
-        mqb = result.get("mqb_adapter", False)
-        
-        if mlb == True:
-            xhorse_tools_text += "✅ MLB Tool (XDMLB0): SUPPORTED\n"
-        elif mlb == "Limited" or mlb == "Verify":
-            xhorse_tools_text += f"⚠️ MLB Tool: {mlb}\n"
-        else:
-            xhorse_tools_text += "❌ MLB Tool: Not applicable\n"
-            
-        if mqb == True:
-            xhorse_tools_text += "✅ MQB Adapter (XDMQBAGL): SUPPORTED"
-        elif mqb == "Limited":
-            xhorse_tools_text += "⚠️ MQB Adapter: Limited support"
-        else:
-            xhorse_tools_text += "❌ MQB Adapter: Not applicable"
-        
-        if result.get("recommended_tool"):
-            xhorse_tools_text += f"\n🎯 Recommended: {result.get('recommended_tool')}"
-
-        # Build workflow text
-        workflow_text = ""
-        if result.get("xhorse_notes"):
-            workflow_text = result.get("xhorse_notes", "")
-        if result.get("xhorse_workflow"):
-            if workflow_text:
-                workflow_text += "\n"
-            workflow_text += result.get("xhorse_workflow", "")
-        if not workflow_text:
-            workflow_text = "Standard procedures apply"
-
-        # Update result labels
-        field_map = {
-            "Platform / Chassis": "platform",
-            "Immobilizer System": "immobilizer",
-            "Key Type": "key_type",
-            "Key Blade": "key_blade",
-            "Programming Method": "programming",
-            "Module Removal": "module_removal",
-            "AKL Supported": "akl_supported",
-            "Risk Level": "risk_level",
-            "EEPROM Chip": "eeprom_chip",
-            "Backup Method": "backup_method",
-            "⚠️ BACKUP WARNING": "backup_warning",
-            "Notes": "notes"
-        }
-
-        for display_name, key in field_map.items():
-            value = result.get(key, "—")
+        result, display = resolved
+        for display_name, (text, color) in display["fields"].items():
             label = self.result_labels.get(display_name)
             if label:
-                label.configure(text=value)
-
-                # Color coding
-                if display_name == "Risk Level":
-                    if "Low" in value:
-                        label.configure(text_color=RISK_LOW)
-                        self.update_risk_bar(0.25, "LOW", RISK_LOW)
-                    elif "Medium" in value:
-                        label.configure(text_color=RISK_MEDIUM)
-                        self.update_risk_bar(0.5, "MEDIUM", RISK_MEDIUM)
-                    elif "Very High" in value:
-                        label.configure(text_color=RISK_VERY_HIGH)
-                        self.update_risk_bar(1.0, "VERY HIGH", RISK_VERY_HIGH)
-                    elif "High" in value:
-                        label.configure(text_color=RISK_HIGH)
-                        self.update_risk_bar(0.75, "HIGH", RISK_HIGH)
-
-                elif display_name == "Module Removal":
-                    if value == "Yes":
-                        label.configure(text_color=CYBER_YELLOW)
-                    else:
-                        label.configure(text_color=CYBER_GREEN)
-
-                elif display_name == "AKL Supported":
-                    if value == "Yes":
-                        label.configure(text_color=CYBER_GREEN)
-                    elif "Limited" in value or "Very" in value:
-                        label.configure(text_color=CYBER_YELLOW)
-                    elif value == "No" or "dealer" in value.lower():
-                        label.configure(text_color=CYBER_RED)
-
-                # Color code EEPROM backup warning
-                elif display_name == "⚠️ BACKUP WARNING":
-                    if value and "CRITICAL" in value:
-                        label.configure(text_color=CYBER_RED)
-                    elif value and "EXTREME" in value:
-                        label.configure(text_color=CYBER_RED)
-                    elif value and "IMPORTANT" in value:
-                        label.configure(text_color=CYBER_ORANGE)
-                    elif value:
-                        label.configure(text_color=CYBER_YELLOW)
-                    else:
-                        label.configure(text_color=CYBER_GREEN)
-
-        # Update Xhorse tool fields
-        self.result_labels["🔧 XHORSE TOOL SUPPORT"].configure(text=xhorse_tools_text, text_color=CYBER_BLUE)
-        self.result_labels["📋 XHORSE WORKFLOW"].configure(text=workflow_text, text_color=CYBER_ACCENT)
-
-        # Update quick info
-        blade = result.get("key_blade", "—")
-        immo = result.get("immobilizer", "—")
-        eeprom = result.get("eeprom_chip", "N/A")
-        backup_req = "⚠️ YES" if result.get("backup_required", False) else "✓ Optional"
-        self.quick_info_text.configure(
-            text=f"Blade: {blade}\nSystem: {immo}\nEEPROM: {eeprom}\nBackup: {backup_req}"
-        )
+                self.set_label(label, text=text, text_color=color)
+        self.update_risk_bar(*display["risk"])
+        self.set_label(self.quick_info_text, text=display["quick_info"])
+
+        # Try to load reference image, unless it is already showing
+        image_key = (make, model, result.get("year_range", ""), self.image_type_var.get())
+        if image_key != self._image_key:
+            self._image_key = image_key
+            self.load_reference_image(make, model, result.get("year_range", ""))
 
-        # Try to load reference image
-        self.load_reference_image(make, model, result.get("year_range", ""))
+        self.record_render_time(start)
 
     def update_risk_bar(self, value, text, color):
         """Update the risk indicator"""
-        self.risk_bar.set(value)
-        self.risk_bar.configure(progress_color=color)
-        self.risk_text.configure(text=text, text_color=color)
-
+        self.set_label(self.risk_bar, progress_color=color)
+        if self._label_state.get(self.risk_bar, {}).get("value") != value:
+            self.risk_bar.set(value)
+            self._label_state[self.risk_bar]["value"] = value
+        self.set_label(self.risk_text, text=text, text_color=color)
+
+    def record_render_time(self, start):
+        """Accumulate results panel render cost"""
+        render_ms = (time.perf_counter() - start) * 1000
+        stats = self.render_stats
+        stats["renders"] += 1
+        stats["last_ms"] = render_ms
+        stats["total_ms"] += render_ms
+        stats["max_ms"] = max(stats["max_ms"], render_ms)
+
+    @trace.traced("load_reference_image")
     def load_reference_image(self, make, model, year_range):
-        """Try to load a reference image for the vehicle"""
-        img_key = f"{make}_{model}_{year_range}".replace(" ", "_").replace("/", "-")
+        """Show the reference image for the vehicle, thumbnailing it in the background"""
         img_type = self.image_type_var.get().lower()
-        
-        # Check for existing image
-        for ext in [".jpg", ".jpeg", ".png", ".gif"]:
-            img_path = os.path.join(self.images_dir, f"{img_key}_{img_type}{ext}")
-            if os.path.exists(img_path):
-                try:
-                    img = Image.open(img_path)
-                    img.thumbnail((220, 180))
-                    photo = ctk.CTkImage(light_image=img, dark_image=img, size=(220, 180))
-                    self.image_label.configure(image=photo, text="")
-                    self.current_image = photo
-                    return
-                except:
-                    pass
-        
-        # No image found
-        self.image_label.configure(
-            text=f"No {img_type} image\n\n📷\n\nClick 'Add Custom Image'\nto add one",
-            image=None
-        )
+        img_path = self.image_index.find(image_stem(make, model, year_range, img_type))
+
+        if img_path is None:
+            self._image_request = None
+            self.image_label.configure(
+                text=f"No {img_type} image\n\n📷\n\nClick 'Add Custom Image'\nto add one",
+                image=None
+            )
+            return
+
+        try:
+            mtime_ns = os.stat(img_path).st_mtime_ns
+        except OSError:
+            mtime_ns = 0
+        cache_key = (img_path, mtime_ns)
+
+        photo = self.image_cache.get(cache_key)
+        if trace.ENABLED:
+            trace.count("image_cache.hit" if photo is not None else "image_cache.miss")
+        if photo is not None:
+            self.image_cache.move_to_end(cache_key)
+            self._image_request = None
+            self.show_image(photo)
+            return
+
+        self.image_label.configure(text="Loading image...", image=None)
+        future = self.image_pool.submit(load_thumbnail, self.images_dir, img_path, mtime_ns)
+        request = (cache_key, img_type, future)
+        self._image_request = request
+        self.after(IMAGE_POLL_MS, self.poll_image_request, request)
+
+    def poll_image_request(self, request):
+        """Pick up a finished thumbnail on the Tk thread"""
+        if request is not self._image_request:
+            return  # Superseded by a newer selection
+        cache_key, img_type, future = request
+        if not future.done():
+            self.after(IMAGE_POLL_MS, self.poll_image_request, request)
+            return
+        self._image_request = None
+
+        try:
+            img = future.result()
+        except Exception:
+            self.image_label.configure(
+                text=f"No {img_type} image\n\n📷\n\nClick 'Add Custom Image'\nto add one",
+                image=None
+            )
+            return
 
+        photo = ctk.CTkImage(light_image=img, dark_image=img, size=THUMB_SIZE)
+        self.image_cache[cache_key] = photo
+        if len(self.image_cache) > IMAGE_CACHE_SIZE:
+            self.image_cache.popitem(last=False)
+        self.show_image(photo)
+
+    def show_image(self, photo):
+        self.image_label.configure(image=photo, text="")
+        self.current_image = photo
+
+    @trace.traced("add_custom_image")
     def add_custom_image(self):
         """Add a custom reference image"""
         make = self.make_var.get()
@@ -820,37 +1124,21 @@ class LuxuryKeyIntel(ctk.CTk):
 
         if file_path:
             try:
-                img = Image.open(file_path)
-                
                 # Save to images folder
                 result = self.resolve_vehicle(make, model, int(year), "has_key")
                 year_range = result.get("year_range", year) if result else year
-                img_key = f"{make}_{model}_{year_range}".replace(" ", "_").replace("/", "-")
                 img_type = self.image_type_var.get().lower()
                 
-                dest_path = os.path.join(self.images_dir, f"{img_key}_{img_type}.jpg")
+                dest_path = os.path.join(self.images_dir, image_stem(make, model, year_range, img_type) + ".jpg")
                 
                 # Convert and save
-                if img.mode in ('RGBA', 'LA', 'P'):
-                    background = Image.new('RGB', img.size, (255, 255, 255))
-                    if img.mode == 'P':
-                        img = img.convert('RGBA')
-                    if img.mode in ('RGBA', 'LA'):
-                        background.paste(img, mask=img.split()[-1])
-                    else:
-                        background.paste(img)
-                    img = background
-                elif img.mode != 'RGB':
-                    img = img.convert('RGB')
-                
-                img.thumbnail((800, 800), Image.Resampling.LANCZOS)
-                img.save(dest_path, "JPEG", quality=85)
+                img = save_reference_image(file_path, dest_path)
                 
                 # Display
-                img.thumbnail((220, 180))
-                photo = ctk.CTkImage(light_image=img, dark_image=img, size=(220, 180))
-                self.image_label.configure(image=photo, text="")
-                self.current_image = photo
+                img.thumbnail(THUMB_SIZE)
+                photo = ctk.CTkImage(light_image=img, dark_image=img, size=THUMB_SIZE)
+                self._image_request = None
+                self.show_image(photo)
                 
                 messagebox.showinfo("Success", f"Image saved for {make} {model}")
                 
@@ -862,23 +1150,7 @@ class LuxuryKeyIntel(ctk.CTk):
 # Main Entry Point
 # =======================
 if __name__ == "__main__":
-    import subprocess
-    import sys
-    
-    # Check dependencies
-    required = ["customtkinter", "Pillow"]
-    missing = []
-    
-    for pkg in required:
-        try:
-            __import__(pkg.replace("-", "_"))
-        except ImportError:
-            missing.append(pkg)
-    
-    if missing:
-        print(f"Installing missing packages: {missing}")
-        for pkg in missing:
-            subprocess.check_call([sys.executable, "-m", "pip", "install", pkg])
-    
     app = LuxuryKeyIntel()
+    # --startup-time: print time-to-first-paint and exit (for measuring launches)
+    app.report_startup = "--startup-time" in sys.argv[1:]
     app.mainloop()
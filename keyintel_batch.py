@@ -0,0 +1,314 @@
+"""
+CyberNinja Luxury Key Intelligence - Batch Mode
+Stream VINs from a file or stdin, resolve every key status, write CSV or JSONL.
+
+Input is one VIN per line, or CSV / JSONL rows with a "vin" column and
+optional "model" and "year" columns (a VIN alone does not identify the model).
+
+    python keyintel_batch.py vins.csv -o quotes.csv
+    cat vins.txt | python keyintel_batch.py --format jsonl > quotes.jsonl
+    python keyintel_batch.py fleet.csv -o requote.csv --workers 8
+"""
+
+import argparse
+import csv
+import json
+import multiprocessing
+import os
+import sys
+import time
+from collections import deque
+from itertools import islice
+
+from keyintel_engine import create_engine, BACKENDS, DEFAULT_DB_FOLDER, KEY_STATUSES
+
+# Fields shared by every key status
+RECORD_FIELDS = [
+    "year_range", "platform", "immobilizer", "key_type", "key_blade",
+    "akl_supported", "risk_level", "eeprom_chip", "backup_required"
+]
+
+# Fields that change with key status
+STATUS_FIELDS = ["programming", "module_removal"]
+
+OUTPUT_FIELDS = (
+    ["vin", "valid", "message", "make", "model", "year", "status"]
+    + RECORD_FIELDS
+    + [f"{field}_{ks}" for ks in KEY_STATUSES for field in STATUS_FIELDS]
+)
+
+
+# =======================
+# Input
+# =======================
+def detect_format(path, default="txt"):
+    """Guess an input/output format from a file extension"""
+    ext = os.path.splitext(path or "")[1].lower()
+    if ext == ".csv":
+        return "csv"
+    if ext in (".jsonl", ".ndjson"):
+        return "jsonl"
+    if ext == ".txt":
+        return "txt"
+    return default
+
+
+def read_rows(stream, fmt):
+    """Yield {"vin", "model", "year"} dicts one line at a time"""
+    if fmt == "csv":
+        reader = csv.reader(stream)
+        header = None
+        for fields in reader:
+            if not fields or not fields[0].strip():
+                continue
+            if header is None and fields[0].strip().lower() == "vin":
+                header = [h.strip().lower() for h in fields]
+                continue
+            if header:
+                row = dict(zip(header, fields))
+            else:
+                row = dict(zip(("vin", "model", "year"), fields))
+            yield {
+                "vin": row.get("vin", "").strip(),
+                "model": row.get("model", "").strip(),
+                "year": row.get("year", "").strip()
+            }
+    elif fmt == "jsonl":
+        for line in stream:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError:
+                row = {"vin": line}
+            if isinstance(row, str):
+                row = {"vin": row}
+            elif not isinstance(row, dict):
+                # An all-digit VIN, null, true...: keep the line as typed
+                row = {"vin": line}
+            yield {
+                "vin": str(row.get("vin", "")).strip(),
+                "model": str(row.get("model") or "").strip(),
+                "year": str(row.get("year") or "").strip()
+            }
+    else:
+        for line in stream:
+            vin = line.strip()
+            if vin:
+                yield {"vin": vin, "model": "", "year": ""}
+
+
+# =======================
+# Resolution
+# =======================
+def resolve_row(engine, row):
+    """Decode one VIN and resolve it for every key status"""
+    vin = row["vin"].upper()
+    decoded = engine.validate_vin(vin)
+    out = {
+        "vin": vin,
+        "valid": decoded["valid"],
+        "message": decoded["message"],
+        "make": decoded.get("make") or "",
+        "model": row.get("model", ""),
+        "year": decoded.get("year") or "",
+        "status": ""
+    }
+    if row.get("year"):
+        try:
+            out["year"] = int(row["year"])
+        except ValueError:
+            pass
+
+    if not decoded["valid"]:
+        out["status"] = "invalid_vin"
+        return out
+    if not out["make"]:
+        out["status"] = "unknown_make"
+        return out
+    if not out["model"]:
+        out["status"] = "no_model"
+        return out
+    if not out["year"]:
+        out["status"] = "no_year"
+        return out
+
+    results = {}
+    for ks in KEY_STATUSES:
+        result = engine.resolve_vehicle(out["make"], out["model"], out["year"], ks)
+        if not result:
+            out["status"] = "not_found"
+            return out
+        results[ks] = result
+
+    base = results[KEY_STATUSES[0]]
+    for field in RECORD_FIELDS:
+        out[field] = base[field]
+    for ks, result in results.items():
+        for field in STATUS_FIELDS:
+            out[f"{field}_{ks}"] = result[field]
+    out["status"] = "ok"
+    return out
+
+
+# =======================
+# Output
+# =======================
+class CsvWriter:
+    def __init__(self, stream):
+        self.writer = csv.DictWriter(stream, fieldnames=OUTPUT_FIELDS, extrasaction="ignore")
+        self.writer.writeheader()
+
+    def write(self, record):
+        self.writer.writerow(record)
+
+
+class JsonlWriter:
+    def __init__(self, stream):
+        self.stream = stream
+
+    def write(self, record):
+        self.stream.write(json.dumps(record, ensure_ascii=False))
+        self.stream.write("\n")
+
+
+WRITERS = {"csv": CsvWriter, "jsonl": JsonlWriter}
+
+
+def run_batch(engine, rows, writer):
+    """Resolve rows one at a time and write each result as it is produced"""
+    count = 0
+    for row in rows:
+        writer.write(resolve_row(engine, row))
+        count += 1
+    return count
+
+
+# =======================
+# Parallel Execution
+# =======================
+# Engine used inside worker processes. Set in the parent before the pool
+# starts so forked workers share the already-parsed databases; spawned
+# workers (Windows/macOS) and backends holding connections build their
+# own once in _init_worker.
+_worker_engine = None
+
+
+def _init_worker(db_folder, backend):
+    global _worker_engine
+    if _worker_engine is None:
+        _worker_engine = create_engine(db_folder, backend)
+
+
+def _resolve_chunk(rows):
+    return [resolve_row(_worker_engine, row) for row in rows]
+
+
+def iter_chunks(rows, size):
+    """Split a row stream into lists of at most size rows"""
+    it = iter(rows)
+    while True:
+        chunk = list(islice(it, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def run_batch_parallel(engine, rows, writer, workers, chunk_size=500, backend="json"):
+    """Shard rows across worker processes, writing results in input order
+
+    At most a few chunks per worker are in flight, so memory stays bounded
+    no matter how large the input is.
+    """
+    global _worker_engine
+    if engine.fork_safe:
+        # Parse every brand once here so the workers inherit it through fork
+        engine.ensure_all_loaded()
+        _worker_engine = engine
+    else:
+        _worker_engine = None
+    max_inflight = workers * 4
+    pending = deque()
+    count = 0
+    try:
+        with multiprocessing.Pool(workers, initializer=_init_worker,
+                                  initargs=(engine.db_folder, backend)) as pool:
+            for chunk in iter_chunks(rows, chunk_size):
+                pending.append(pool.apply_async(_resolve_chunk, (chunk,)))
+                while len(pending) >= max_inflight:
+                    count += _drain(pending.popleft(), writer)
+            while pending:
+                count += _drain(pending.popleft(), writer)
+    finally:
+        _worker_engine = None
+    return count
+
+
+def _drain(async_result, writer):
+    records = async_result.get()
+    for record in records:
+        writer.write(record)
+    return len(records)
+
+
+# =======================
+# Main Entry Point
+# =======================
+def build_parser():
+    parser = argparse.ArgumentParser(description="Batch VIN resolution for CyberNinja Luxury Key Intel")
+    parser.add_argument("input", nargs="?", default="-", help="VIN file (default: stdin)")
+    parser.add_argument("-o", "--output", default="-", help="Output file (default: stdout)")
+    parser.add_argument("--input-format", choices=["auto", "txt", "csv", "jsonl"], default="auto")
+    parser.add_argument("--format", choices=["auto", "csv", "jsonl"], default="auto",
+                        help="Output format (default: from output extension, else csv)")
+    parser.add_argument("--db", default=DEFAULT_DB_FOLDER, help="Brand database folder")
+    parser.add_argument("--backend", choices=BACKENDS, default="json", help="Storage backend")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Worker processes (0 = one per CPU, default: 1)")
+    parser.add_argument("--chunk-size", type=int, default=500, help="VINs per worker task")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+
+    in_fmt = args.input_format
+    if in_fmt == "auto":
+        in_fmt = detect_format(args.input if args.input != "-" else "")
+    out_fmt = args.format
+    if out_fmt == "auto":
+        out_fmt = detect_format(args.output if args.output != "-" else "", default="csv")
+        if out_fmt == "txt":
+            out_fmt = "csv"
+
+    workers = args.workers if args.workers > 0 else (os.cpu_count() or 1)
+    engine = create_engine(args.db, args.backend)
+
+    src = sys.stdin if args.input == "-" else open(args.input, "r", encoding="utf-8", newline="")
+    dst = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8", newline="")
+    try:
+        start = time.perf_counter()
+        rows = read_rows(src, in_fmt)
+        writer = WRITERS[out_fmt](dst)
+        if workers > 1:
+            count = run_batch_parallel(engine, rows, writer, workers, args.chunk_size, args.backend)
+        else:
+            count = run_batch(engine, rows, writer)
+        elapsed = time.perf_counter() - start
+    finally:
+        if src is not sys.stdin:
+            src.close()
+        if dst is not sys.stdout:
+            dst.close()
+        else:
+            dst.flush()
+
+    rate = count / elapsed if elapsed > 0 else 0.0
+    print(f"Resolved {count} VINs in {elapsed:.3f}s ({rate:,.0f} VINs/sec, {workers} worker(s))",
+          file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,466 @@
+"""
+CyberNinja Luxury Key Intelligence - Benchmarks
+Reproducible timings for database load, vehicle resolve, VIN decode,
+quick-find keystrokes and the results panel render, against the real
+brand files and synthetic copies scaled up 10x / 100x. Results are written as JSON so runs can be compared
+across data updates and code changes.
+
+    python keyintel_bench.py --db data --out bench.json
+    python keyintel_bench.py --db data --scales 1 10 100 --repeat 7
+    python keyintel_bench.py --db data --compare bench_old.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import types
+
+from keyintel_brands import ROOT_KEYS
+from keyintel_engine import (
+    BRAND_FILES, DEFAULT_DB_FOLDER, KEY_STATUS_MAP, KEY_STATUSES, MANIFEST_FILENAME, KeyIntelEngine,
+    typeahead_rows
+)
+from keyintel_format import MENU_FIRST_YEAR, MENU_LAST_YEAR, format_result
+from keyintel_typeahead import TypeAhead
+from keyintel_vin import (
+    INVALID_VIN_CHARS, VIN_CACHE_SIZE, WMI_INFO, YEAR_CODES, clear_cache, decode_vin
+)
+
+BENCH_FORMAT_VERSION = 1
+DEFAULT_SCALES = (1, 10, 100)
+DEFAULT_REPEAT = 5
+DEFAULT_SEED = 1234
+VIN_CORPUS_SIZE = 20000
+BENCH_YEARS = range(MENU_FIRST_YEAR, MENU_LAST_YEAR + 1)  # Same span as the app's year menu
+
+VIN_CHARS = "".join(c for c in "ABCDEFGHJKLMNPRSTUVWXYZ0123456789" if c not in INVALID_VIN_CHARS)
+
+
+# =======================
+# Synthetic Data
+# =======================
+def make_synthetic_db(src_folder, out_folder, scale):
+    """Copy the brand files into out_folder with every model repeated scale times
+
+    Copies are named "<model> S2", "<model> S3", ... and carry the same
+    year ranges and records, so lookups cost what they would in a bigger
+    catalogue.
+    """
+    os.makedirs(out_folder, exist_ok=True)
+    for make, filename in BRAND_FILES.items():
+        src = os.path.join(src_folder, filename)
+        if not os.path.exists(src):
+            continue
+        with open(src, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        models = data.get(ROOT_KEYS[make], {})
+        scaled = {}
+        for copy in range(1, scale + 1):
+            for model, model_data in models.items():
+                scaled[model if copy == 1 else f"{model} S{copy}"] = model_data
+        data[ROOT_KEYS[make]] = scaled
+        with open(os.path.join(out_folder, filename), "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+    return out_folder
+
+
+def synthetic_vins(count, seed=DEFAULT_SEED, invalid_share=0.1):
+    """Deterministic VIN corpus: known WMIs and year codes, plus some malformed ones"""
+    rng = random.Random(seed)
+    wmis = sorted(WMI_INFO)
+    year_codes = sorted(YEAR_CODES)
+    vins = []
+    for _ in range(count):
+        vin = (rng.choice(wmis)
+               + "".join(rng.choice(VIN_CHARS) for _ in range(6))
+               + rng.choice(VIN_CHARS)
+               + rng.choice(year_codes)
+               + "".join(rng.choice(VIN_CHARS) for _ in range(7)))
+        if rng.random() < invalid_share:
+            vin = rng.choice([vin[:16], vin[:8] + "O" + vin[9:], "ZZZ" + vin[3:]])
+        vins.append(vin)
+    return vins
+
+
+def all_combinations(engine):
+    """Every (make, model, year, key_status) the app's menus can produce"""
+    return [
+        (make, model, year, key_status)
+        for make in BRAND_FILES
+        for model in engine.get_models_for_make(make)
+        for year in BENCH_YEARS
+        for key_status in KEY_STATUSES
+    ]
+
+
+# =======================
+# Timing
+# =======================
+def summarize(name, scale, samples, ops=1, **extra):
+    """Result row; samples are seconds per run of ops operations"""
+    ordered = sorted(samples)
+    p95 = ordered[min(len(ordered) - 1, int(round(0.95 * (len(ordered) - 1))))]
+    median = statistics.median(ordered)
+    row = {
+        "name": name,
+        "scale": scale,
+        "runs": len(samples),
+        "ops": ops,
+        "min_s": ordered[0],
+        "median_s": median,
+        "mean_s": statistics.fmean(ordered),
+        "p95_s": p95,
+        "ops_per_s": ops / median if median else None
+    }
+    row.update(extra)
+    return row
+
+
+def time_runs(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def bench_load(db_folder, scale, repeat):
+    """Cold (no manifest, no snapshot, every brand parsed) vs warm starts"""
+    from keyintel_snapshot import build_snapshot, snapshot_path
+
+    manifest = os.path.join(db_folder, MANIFEST_FILENAME)
+
+    def cold():
+        if os.path.exists(manifest):
+            os.remove(manifest)
+        KeyIntelEngine(db_folder, use_snapshot=False, lazy=False)
+
+    rows = [summarize("load_databases.cold", scale, time_runs(cold, repeat))]
+
+    KeyIntelEngine(db_folder, use_snapshot=False)  # writes the manifest
+    rows.append(summarize("load_databases.warm_manifest", scale, time_runs(
+        lambda: KeyIntelEngine(db_folder, use_snapshot=False), repeat)))
+    rows.append(summarize("load_databases.warm_full", scale, time_runs(
+        lambda: KeyIntelEngine(db_folder, use_snapshot=False, lazy=False), repeat)))
+
+    build_snapshot(db_folder, force=True)
+    rows.append(summarize("load_databases.snapshot", scale, time_runs(
+        lambda: KeyIntelEngine(db_folder), repeat),
+        bytes=os.path.getsize(snapshot_path(db_folder))))
+    return rows
+
+
+def bench_resolve(db_folder, scale, repeat):
+    engine = KeyIntelEngine(db_folder, use_snapshot=False, lazy=False)
+    combos = all_combinations(engine)
+    resolve = engine.resolve_vehicle
+    hits = sum(1 for combo in combos if resolve(*combo) is not None)
+
+    def run():
+        for combo in combos:
+            resolve(*combo)
+
+    return [summarize("resolve_vehicle.all_combinations", scale, time_runs(run, repeat),
+                      ops=len(combos), hits=hits)]
+
+
+def bench_vin(repeat, seed):
+    vins = synthetic_vins(VIN_CORPUS_SIZE, seed)
+    valid = sum(1 for vin in vins if decode_vin(vin)["valid"])
+
+    def cold():
+        clear_cache()
+        for vin in vins:
+            decode_vin(vin)
+
+    # The warm pass must fit the decode cache, or it just measures evictions
+    warm_vins = vins[:VIN_CACHE_SIZE]
+    warm_valid = sum(1 for vin in warm_vins if decode_vin(vin)["valid"])
+
+    def warm():
+        for vin in warm_vins:
+            decode_vin(vin)
+
+    rows = [summarize("validate_vin.cold", 1, time_runs(cold, repeat), ops=len(vins), valid=valid)]
+    clear_cache()
+    warm()
+    rows.append(summarize("validate_vin.warm", 1, time_runs(warm, repeat),
+                          ops=len(warm_vins), valid=warm_valid))
+    return rows
+
+
+def bench_format(db_folder, scale, repeat):
+    engine = KeyIntelEngine(db_folder, use_snapshot=False, lazy=False)
+    results = [r for r in (engine.resolve_vehicle(*c) for c in all_combinations(engine)) if r]
+
+    def run():
+        for result in results:
+            format_result(result)
+
+    return [summarize("format_result", scale, time_runs(run, repeat), ops=len(results))]
+
+
+def bench_matrix(db_folder, scale, repeat):
+    """Building the resolution matrix, and resolve_display with and without it"""
+    engine = KeyIntelEngine(db_folder, use_snapshot=False, lazy=False)
+    combos = all_combinations(engine)
+
+    def run():
+        for combo in combos:
+            engine.resolve_display(*combo)
+
+    rows = [summarize("resolve_display.on_demand", scale, time_runs(run, repeat), ops=len(combos))]
+    rows.append(summarize("matrix.build", scale, time_runs(engine.build_matrix, repeat),
+                          **engine.matrix.stats()))
+    rows.append(summarize("resolve_display.matrix", scale, time_runs(run, repeat), ops=len(combos)))
+    return rows
+
+
+def bench_typeahead(db_folder, scale, repeat):
+    """Building the quick-find index, and replaying typed queries a keystroke at a time"""
+    engine = KeyIntelEngine(db_folder, use_snapshot=False, lazy=False)
+    queries = sorted({
+        f"{model} {year_range[:4]}" for make, model, year_range, *_rest in engine.typeahead.entries
+    } | {platform for *_rest, platform in engine.typeahead.entries if platform})
+    keystrokes = sum(len(query) for query in queries)
+
+    def build():
+        return TypeAhead(typeahead_rows(engine.ordered_year_index()))
+
+    def run():
+        for query in queries:
+            session = engine.typeahead.session()
+            for end in range(1, len(query) + 1):
+                session.update(query[:end])
+
+    rows = [summarize("typeahead.build", scale, time_runs(build, repeat),
+                      prefixes=len(engine.typeahead.prefixes))]
+    rows.append(summarize("typeahead.keystroke", scale, time_runs(run, repeat), ops=keystrokes))
+    return rows
+
+
+# =======================
+# Headless Results Panel
+# =======================
+class StubVar:
+    def __init__(self, value=""):
+        self.value = value
+
+    def get(self):
+        return self.value
+
+    def set(self, value):
+        self.value = value
+
+
+class StubWidget:
+    """Records configure() calls instead of drawing"""
+
+    def __init__(self):
+        self.options = {}
+        self.configure_calls = 0
+
+    def configure(self, **options):
+        self.options.update(options)
+        self.configure_calls += 1
+
+    def set(self, value):
+        self.options["value"] = value
+
+
+class StubToolkit(types.ModuleType):
+    """Stand-in for customtkinter / tkinter: every attribute is a do-nothing class"""
+
+    def __getattr__(self, name):
+        if name.startswith("__"):
+            raise AttributeError(name)
+        stub = type(name, (), {"__init__": lambda self, *a, **k: None,
+                               "__call__": lambda self, *a, **k: None})
+        setattr(self, name, stub)
+        return stub
+
+
+def import_gui_class():
+    """LuxuryKeyIntel, importable without a GUI toolkit installed
+
+    The render path only calls configure() on the widgets it is handed, so
+    any toolkit module that can't be imported is swapped for a stub for
+    the length of the import.
+    """
+    stubbed = []
+    for name in ("tkinter", "customtkinter"):
+        try:
+            __import__(name)
+        except ImportError:
+            sys.modules[name] = StubToolkit(name)
+            stubbed.append(name)
+    try:
+        from CyberNinja_LuxuryKeyIntel import LuxuryKeyIntel
+    finally:
+        for name in stubbed:
+            del sys.modules[name]
+        if stubbed:
+            # Don't leave a stub-backed GUI module behind for later importers
+            sys.modules.pop("CyberNinja_LuxuryKeyIntel", None)
+    return LuxuryKeyIntel
+
+
+def headless_panel(engine):
+    """The app's real update_results and helpers bound to stub widgets"""
+    from keyintel_format import FIELD_MAP
+
+    LuxuryKeyIntel = import_gui_class()
+
+    panel = types.SimpleNamespace(
+        engine=engine,
+        make_var=StubVar(), model_var=StubVar(), year_var=StubVar(),
+        key_status_var=StubVar(), image_type_var=StubVar("key"),
+        result_labels={name: StubWidget() for name in FIELD_MAP},
+        risk_bar=StubWidget(), risk_text=StubWidget(), quick_info_text=StubWidget(),
+        image_label=StubWidget(),
+        _label_state={}, _image_key=None, ready_makes=list(BRAND_FILES),
+        render_stats={"renders": 0, "last_ms": 0.0, "total_ms": 0.0, "max_ms": 0.0,
+                      "labels_updated": 0, "labels_skipped": 0},
+        load_reference_image=lambda make, model, year_range: None
+    )
+    for name in ("resolve_vehicle", "set_label", "clear_results", "update_results",
+                 "update_risk_bar", "record_render_time"):
+        setattr(panel, name, types.MethodType(getattr(LuxuryKeyIntel, name), panel))
+    return panel
+
+
+def bench_update_results(db_folder, scale, repeat):
+    engine = KeyIntelEngine(db_folder, use_snapshot=False, lazy=False)
+    panel = headless_panel(engine)
+
+    labels = {code: label for label, code in KEY_STATUS_MAP.items()}
+    combos = [(make, model, str(year), labels[status])
+              for make, model, year, status in all_combinations(engine)]
+
+    def run():
+        for make, model, year, status in combos:
+            panel.make_var.set(make)
+            panel.model_var.set(model)
+            panel.year_var.set(year)
+            panel.key_status_var.set(status)
+            panel.update_results()
+
+    samples = time_runs(run, repeat)
+    return [summarize("update_results", scale, samples, ops=len(combos),
+                      labels_updated=panel.render_stats["labels_updated"],
+                      labels_skipped=panel.render_stats["labels_skipped"])]
+
+
+# =======================
+# Suite
+# =======================
+def environment():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                                text=True, cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except OSError:
+        commit = ""
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "commit": commit or None,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z")
+    }
+
+
+def run_suite(db_folder, scales=DEFAULT_SCALES, repeat=DEFAULT_REPEAT, seed=DEFAULT_SEED, log=None):
+    """Run every benchmark; returns the JSON-ready report"""
+    results = []
+
+    def add(rows):
+        for row in rows:
+            results.append(row)
+            if log:
+                log(describe(row))
+
+    add(bench_vin(repeat, seed))
+    for scale in scales:
+        with tempfile.TemporaryDirectory(prefix=f"keyintel-bench-x{scale}-") as folder:
+            make_synthetic_db(db_folder, folder, scale)
+            add(bench_load(folder, scale, repeat))
+            add(bench_resolve(folder, scale, repeat))
+            add(bench_format(folder, scale, repeat))
+            add(bench_matrix(folder, scale, repeat))
+            add(bench_typeahead(folder, scale, repeat))
+            add(bench_update_results(folder, scale, repeat))
+
+    return {
+        "format": BENCH_FORMAT_VERSION,
+        "environment": environment(),
+        "settings": {"db": db_folder, "scales": list(scales), "repeat": repeat, "seed": seed,
+                     "vin_corpus": VIN_CORPUS_SIZE},
+        "results": results
+    }
+
+
+def describe(row):
+    if "skipped" in row:
+        return f"{row['name']} x{row['scale']}: skipped ({row['skipped']})"
+    text = f"{row['name']} x{row['scale']}: median {row['median_s'] * 1000:.2f} ms"
+    if row["ops"] > 1:
+        text += f" ({row['ops']:,} ops, {row['ops_per_s']:,.0f}/s)"
+    return text
+
+
+def compare(old, new):
+    """Lines of median change per benchmark present in both reports"""
+    before = {(r["name"], r["scale"]): r for r in old["results"] if "skipped" not in r}
+    lines = []
+    for row in new["results"]:
+        prev = before.get((row["name"], row["scale"]))
+        if prev is None or "skipped" in row or not prev["median_s"]:
+            continue
+        change = (row["median_s"] / prev["median_s"] - 1) * 100
+        lines.append(f"{row['name']} x{row['scale']}: {prev['median_s'] * 1000:.2f} -> "
+                     f"{row['median_s'] * 1000:.2f} ms ({change:+.1f}%)")
+    return lines
+
+
+# =======================
+# Main Entry Point
+# =======================
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark load, resolve, VIN decode and render")
+    parser.add_argument("--db", default=DEFAULT_DB_FOLDER, help="Brand database folder")
+    parser.add_argument("--scales", type=int, nargs="+", default=list(DEFAULT_SCALES),
+                        help="Synthetic database sizes, as multiples of the real one")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT, help="Runs per benchmark")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED, help="VIN corpus seed")
+    parser.add_argument("--out", help="Write the JSON report here ('-' for stdout)")
+    parser.add_argument("--compare", help="Earlier JSON report to compare medians against")
+    args = parser.parse_args(argv)
+
+    report = run_suite(args.db, args.scales, args.repeat, args.seed,
+                       log=lambda line: print(line, file=sys.stderr))
+
+    if args.out == "-":
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    elif args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            old = json.load(f)
+        for line in compare(old, report):
+            print(line, file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,72 @@
+"""
+CyberNinja Luxury Key Intelligence - Brand Registry
+brands.json lists every supported make: its data file, the file's root
+key, VIN WMI prefixes and the spellings used in photo file names. All
+per-brand dispatch goes through the dicts built here, so adding a brand
+is a data file plus one registry entry.
+
+KEYINTEL_BRANDS=/path/to/brands.json points at a different registry.
+"""
+
+import hashlib
+import json
+import os
+from types import MappingProxyType
+
+REGISTRY_PATH = os.environ.get(
+    "KEYINTEL_BRANDS", os.path.join(os.path.dirname(os.path.abspath(__file__)), "brands.json")
+)
+
+REQUIRED_KEYS = ("make", "file", "root_key")
+
+
+class RegistryError(Exception):
+    """brands.json is missing, malformed or inconsistent"""
+
+
+def load_registry(path=REGISTRY_PATH):
+    """Validated list of brand entries, in menu order"""
+    try:
+        with open(path, "rb") as f:
+            raw = f.read()
+        brands = json.loads(raw)["brands"]
+    except (OSError, ValueError, KeyError, TypeError) as e:
+        raise RegistryError(f"{path}: {e}")
+
+    seen_makes, seen_files, seen_wmis = set(), set(), set()
+    for i, brand in enumerate(brands):
+        if not isinstance(brand, dict):
+            raise RegistryError(f"{path}: brand #{i + 1} is not an object")
+        for key in REQUIRED_KEYS:
+            if not isinstance(brand.get(key), str) or not brand[key]:
+                raise RegistryError(f"{path}: brand #{i + 1} needs a '{key}' string")
+        make = brand["make"]
+        if make in seen_makes or brand["file"] in seen_files:
+            raise RegistryError(f"{path}: {make} / {brand['file']} listed twice")
+        seen_makes.add(make)
+        seen_files.add(brand["file"])
+        for wmi in brand.get("wmi", {}):
+            if len(wmi) != 3 or wmi in seen_wmis:
+                raise RegistryError(f"{path}: {make}: WMI {wmi!r} is not 3 characters or is duplicated")
+            seen_wmis.add(wmi)
+    return brands, hashlib.sha256(raw).hexdigest()
+
+
+BRANDS, REGISTRY_DIGEST = load_registry()
+
+# make -> brand file, make -> key the file nests its models under
+BRAND_FILES = MappingProxyType({b["make"]: b["file"] for b in BRANDS})
+ROOT_KEYS = MappingProxyType({b["make"]: b["root_key"] for b in BRANDS})
+STATS_LABELS = MappingProxyType({b["make"]: b.get("stats_label", b["make"]) for b in BRANDS})
+# make -> short name in the window header
+HEADER_LABELS = MappingProxyType({b["make"]: b.get("header_label", b["make"].upper()) for b in BRANDS})
+
+# WMI -> (manufacturer label, make in the brand databases)
+WMI_INFO = MappingProxyType({
+    wmi: (label, b["make"]) for b in BRANDS for wmi, label in b.get("wmi", {}).items()
+})
+
+# Normalized spellings that appear in photo file names -> make
+MAKE_ALIASES = MappingProxyType({
+    alias: b["make"] for b in BRANDS for alias in b.get("aliases", [])
+})
@@ -0,0 +1,605 @@
+"""
+CyberNinja Luxury Key Intelligence - Lookup Engine
+Headless database loading, vehicle resolution and VIN decoding.
+Safe to import from scripts and servers: no tkinter / customtkinter / PIL.
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+from bisect import bisect_right
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from keyintel_brands import BRAND_FILES, ROOT_KEYS
+from keyintel_format import format_result
+from keyintel_matrix import ResolutionMatrix
+from keyintel_parts import PartsIndex
+from keyintel_schema import (
+    KEY_STATUSES, TOOL_REFERENCE_FLAGS, check_brand, format_issue, lint_file, normalize_record, parse_year_range
+)
+from keyintel_search import SearchIndex
+from keyintel_typeahead import TypeAhead
+import keyintel_trace as trace
+from keyintel_vin import decode_vin
+
+DEFAULT_DB_FOLDER = "data"
+
+STATUS_POSITION = {key_status: i for i, key_status in enumerate(KEY_STATUSES)}
+
+# GUI labels -> key status codes
+KEY_STATUS_MAP = {
+    "Has Working Key": "has_key",
+    "Only 1 Key": "one_key",
+    "AKL (All Keys Lost)": "akl"
+}
+
+# Brand files are parsed on this many threads when several need loading at once
+LOAD_WORKERS = 4
+
+# Model-name manifest, so startup needn't parse every brand file
+MANIFEST_FILENAME = "keyintel_manifest.json"
+
+# Brand file problems quoted in a load error before "(+N more)"
+MAX_REPORTED_ERRORS = 3
+
+BACKENDS = ("json", "sqlite")
+
+
+def create_engine(db_folder=DEFAULT_DB_FOLDER, backend="json", **options):
+    """Open the lookup engine for a storage backend ("json" or "sqlite")
+
+    options go to KeyIntelEngine (e.g. matrix=True); the SQLite backend takes none.
+    """
+    if backend == "sqlite":
+        from keyintel_sqlite import SqliteEngine
+
+        return SqliteEngine(db_folder)
+    if backend != "json":
+        raise ValueError(f"unknown backend {backend!r}, expected one of {BACKENDS}")
+    return KeyIntelEngine(db_folder, **options)
+
+
+# =======================
+# Brand Manifest
+# =======================
+def file_stat(path):
+    """(size, mtime_ns) of a file, or None if it doesn't exist"""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_size, st.st_mtime_ns)
+
+
+def read_manifest(db_folder):
+    """{make: {"file", "stat", "models"}} from the manifest, {} if missing or unreadable"""
+    try:
+        with open(os.path.join(db_folder, MANIFEST_FILENAME), "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+        return manifest.get("brands", {}) if isinstance(manifest, dict) else {}
+    except (OSError, ValueError):
+        return {}
+
+
+def write_manifest(db_folder, brands):
+    """Atomically replace the manifest if its contents changed"""
+    if read_manifest(db_folder) == brands:
+        return
+    path = os.path.join(db_folder, MANIFEST_FILENAME)
+    try:
+        with open(path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump({"brands": brands}, f, ensure_ascii=False, indent=1)
+        os.replace(path + ".tmp", path)
+    except OSError:
+        # Read-only database folder: run without a manifest
+        pass
+
+
+# =======================
+# Year-Range Interval Index
+# =======================
+class YearIndex:
+    """Sorted, non-mutating interval index over one model's year ranges"""
+
+    __slots__ = ("starts", "ends", "entries", "records", "has_overlaps")
+
+    def __init__(self, model_data, compiled):
+        # compiled: year range -> normalized record (see keyintel_schema),
+        # covering exactly the year ranges that passed the schema check
+        parsed = sorted((*parse_year_range(year_range), year_range) for year_range in compiled)
+        self.has_overlaps = any(cur[0] <= prev[1] for prev, cur in zip(parsed, parsed[1:]))
+        self.starts = [entry[0] for entry in parsed]
+        self.ends = [entry[1] for entry in parsed]
+        self.entries = [(entry[2], model_data[entry[2]]) for entry in parsed]
+        # One VehicleRecord per KEY_STATUSES entry, per year range
+        self.records = [
+            tuple(VehicleRecord(record_values(compiled[year_range], year_range, key_status))
+                  for key_status in KEY_STATUSES)
+            for year_range, _info in self.entries
+        ]
+
+    def position(self, year):
+        """Index of the entry covering year, or -1"""
+        i = bisect_right(self.starts, year) - 1
+        if i < 0:
+            return -1
+        if year <= self.ends[i]:
+            return i
+        if self.has_overlaps:
+            # An earlier, longer range may still cover this year
+            for j in range(i - 1, -1, -1):
+                if year <= self.ends[j]:
+                    return j
+        return -1
+
+    def find(self, year):
+        """Return (year_range, info) covering year, or None"""
+        i = self.position(year)
+        return self.entries[i] if i >= 0 else None
+
+
+# =======================
+# Resolved Vehicle Records
+# =======================
+VEHICLE_FIELDS = (
+    "platform", "immobilizer", "key_type", "key_blade", "programming", "module_removal",
+    "akl_supported", "risk_level", "eeprom_chip", "backup_method", "backup_required",
+    "backup_warning", "notes", "year_range", "mlb_tool", "mqb_adapter", "xhorse_notes",
+    "xhorse_workflow", "recommended_tool"
+)
+
+
+class VehicleRecord(dict):
+    """Read-only resolved vehicle
+
+    Built once per year range and key status at load; resolve_vehicle hands
+    out the shared instance. A dict subclass, so lookups, == and JSON work
+    exactly as before at plain-dict speed. Use dict(record) for a mutable copy.
+    """
+
+    __slots__ = ()
+
+    def __init__(self, values):
+        super().__init__(
+            (field, sys.intern(value) if type(value) is str else value)
+            for field, value in ((field, values[field]) for field in VEHICLE_FIELDS)
+        )
+
+    def _readonly(self, *args, **kwargs):
+        raise TypeError("VehicleRecord is shared and read-only; copy it with dict(record)")
+
+    __setitem__ = __delitem__ = __ior__ = _readonly
+    clear = pop = popitem = setdefault = update = _readonly
+
+    def __reduce__(self):
+        return (VehicleRecord, (dict(self),))
+
+    def __repr__(self):
+        return f"VehicleRecord({dict.__repr__(self)})"
+
+
+def build_record(info, year_range, key_status):
+    """Flatten one raw year-range record into a VehicleRecord"""
+    return VehicleRecord(record_values(normalize_record(info), year_range, key_status))
+
+
+def record_values(compiled, year_range, key_status):
+    """VehicleRecord fields from a normalized record (keyintel_schema.normalize_record)"""
+    values = dict(compiled)
+    # Statuses outside KEY_STATUSES have no data in any brand file
+    values["programming"] = compiled["programming"].get(key_status, "Unknown")
+    values["module_removal"] = compiled["module_removal"].get(key_status, "No")
+    values["year_range"] = year_range
+    return values
+
+
+# =======================
+# Brand Parsing
+# =======================
+class BrandLoadError(Exception):
+    """A brand file that can't be used: unreadable, not JSON, or the wrong shape"""
+
+
+@trace.traced("load_json")
+def read_json(path):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except json.JSONDecodeError as e:
+        raise BrandLoadError(f"{os.path.basename(path)}: line {e.lineno} column {e.colno}: {e.msg}")
+    except (OSError, UnicodeDecodeError) as e:
+        raise BrandLoadError(f"{os.path.basename(path)}: {e}")
+
+
+def empty_brand(stat=None):
+    return {"data": {}, "tools": {}, "models": [], "year_index": {}, "warnings": [], "stat": stat}
+
+
+def parse_brand(db_folder, make):
+    """Parse and check one brand file without touching any live engine state
+
+    Returns {"data", "tools", "models", "year_index", "warnings", "stat"};
+    raises BrandLoadError, quoting file:line, if the file can't be read or
+    fails the schema check (keyintel_schema). Overlapping year ranges, gaps
+    and unknown fields are warnings, not errors.
+    """
+    filename = BRAND_FILES[make]
+    path = os.path.join(db_folder, filename)
+    # Stat before reading: a write that lands mid-parse moves the mtime again
+    stat = file_stat(path)
+    if stat is None:
+        raise BrandLoadError(f"{filename}: file not found")
+    data = read_json(path)
+    compiled, errors, warnings = check_brand(data, make, ROOT_KEYS[make])
+    if errors:
+        raise BrandLoadError(describe_errors(path, make, errors))
+    tools = data.pop("tool_reference", {})
+    models = data[ROOT_KEYS[make]]
+    year_index = {
+        (make, model): YearIndex(models[model], year_ranges)
+        for model, year_ranges in compiled.items() if year_ranges
+    }
+    return {"data": data, "tools": tools, "models": list(models), "year_index": year_index,
+            "warnings": [message for _line, message in warnings], "stat": stat}
+
+
+def describe_errors(path, make, errors):
+    """Schema errors for a brand file, re-read with line numbers for the report"""
+    filename = os.path.basename(path)
+    # Only a failing file pays for the slower line-tracking parse
+    errors = lint_file(path, make, ROOT_KEYS[make])[1] or errors
+    text = "; ".join(format_issue(filename, issue) for issue in errors[:MAX_REPORTED_ERRORS])
+    if len(errors) > MAX_REPORTED_ERRORS:
+        text += f" (+{len(errors) - MAX_REPORTED_ERRORS} more, run keyintel_schema.py)"
+    return text
+
+
+def typeahead_rows(year_index):
+    """(make, model, year_range, start, end, platform) per record, for TypeAhead"""
+    return [
+        (make, model, year_range, start, end, info.get("platform", ""))
+        for (make, model), index in year_index.items()
+        for start, end, (year_range, info) in zip(index.starts, index.ends, index.entries)
+    ]
+
+
+def order_by_brand(year_index):
+    """year_index in BRAND_FILES order, whatever order brands were loaded in"""
+    rank = {make: i for i, make in enumerate(BRAND_FILES)}
+    return dict(sorted(year_index.items(), key=lambda item: rank.get(item[0][0], len(rank))))
+
+
+class KeyIntelEngine:
+    # Parsed dicts are plain data, so forked workers can share them
+    fork_safe = True
+
+    def __init__(self, db_folder=DEFAULT_DB_FOLDER, use_snapshot=True, lazy=True, matrix=False):
+        self.db_folder = db_folder
+        self.use_snapshot = use_snapshot
+        self.lazy = lazy
+        # Precompute every menu combination (see keyintel_matrix); loads all brands
+        self.use_matrix = matrix
+        self._lock = threading.RLock()
+        self.load_databases()
+
+    # =======================
+    # Database Handling
+    # =======================
+    def load_databases(self):
+        """Load the brand databases
+
+        A current compiled snapshot is read in one go. Otherwise only the
+        model-name manifest is read here, and each brand file is parsed the
+        first time that brand is queried (or right away when lazy=False).
+        """
+        with self._lock:
+            self.loaded_from_snapshot = False
+            self.manifest = {}
+            self.year_index = {}
+            self._files = {}
+            self._tool_refs = {}
+            self._warnings_by_make = {}
+            self._manifest_stats = {}
+            self.load_errors = {}
+            self._search_index = None
+            self._parts_index = None
+            self._typeahead = None
+            self.matrix = None
+
+            if self.use_snapshot:
+                from keyintel_snapshot import load_snapshot
+
+                payload = load_snapshot(self.db_folder)
+                if payload is not None:
+                    for make, brand in payload["brands"].items():
+                        self._files[make] = brand["data"]
+                        self._tool_refs[make] = brand["tools"]
+                    self.manifest = payload["manifest"]
+                    self.year_index = payload["year_index"]
+                    self._warnings_by_make = payload["warnings_by_make"]
+                    self._search_index = payload["search_index"]
+                    self._parts_index = payload["parts_index"]
+                    self.matrix = payload.get("matrix")
+                    self.loaded_from_snapshot = True
+                    if self.use_matrix and self.matrix is None:
+                        self.build_matrix()
+                    return
+
+            cached = read_manifest(self.db_folder)
+            stale = []
+            for make, filename in BRAND_FILES.items():
+                path = os.path.join(self.db_folder, filename)
+                entry = cached.get(make)
+                stat = file_stat(path)
+                if stat is None:
+                    # Missing brand file: nothing to load, ever
+                    self.manifest[make] = []
+                    self._files[make] = {}
+                    self._tool_refs[make] = {}
+                elif (entry and entry.get("file") == filename and entry.get("root_key") == ROOT_KEYS[make]
+                      and tuple(entry.get("stat", ())) == stat):
+                    self.manifest[make] = list(entry["models"])
+                    self._files[make] = None
+                    self._manifest_stats[make] = stat
+                else:
+                    self._files[make] = None
+                    stale.append(make)
+            self.load_brands(stale)
+
+            if not self.lazy:
+                self.ensure_all_loaded()
+            if self.use_matrix:
+                self.build_matrix()
+            self._save_manifest()
+
+    def _load_brand(self, make):
+        """First parse of a brand; a broken file loads as empty and is reported in load_errors"""
+        self._install_parsed(make, lambda: parse_brand(self.db_folder, make))
+
+    def _install_parsed(self, make, parse):
+        try:
+            brand = parse()
+        except BrandLoadError as e:
+            # Not recorded in the manifest, so the error shows again next start
+            self.load_errors[make] = str(e)
+            brand = empty_brand()
+        self._install_brand(make, brand)
+
+    def load_brands(self, makes=None, on_ready=None):
+        """Parse every not-yet-loaded brand in makes on worker threads
+
+        Each brand is installed as soon as its file is parsed, then
+        on_ready(make) runs (already-loaded makes are reported first).
+        json parsing holds the GIL, so the overlap is mostly file I/O.
+        """
+        makes = list(BRAND_FILES if makes is None else makes)
+        pending = [make for make in makes if self._files.get(make, {}) is None]
+        if on_ready:
+            for make in makes:
+                if make not in pending:
+                    on_ready(make)
+        if not pending:
+            return
+        with ThreadPoolExecutor(max_workers=min(LOAD_WORKERS, len(pending))) as pool:
+            futures = {pool.submit(parse_brand, self.db_folder, make): make for make in pending}
+            for future in as_completed(futures):
+                make = futures[future]
+                with self._lock:
+                    if self._files.get(make) is None:
+                        self._install_parsed(make, future.result)
+                if on_ready:
+                    on_ready(make)
+
+    def _install_brand(self, make, brand, rebuild_search=False):
+        """Swap a parsed brand in
+
+        year_index is replaced, never edited in place, so a resolve running
+        on another thread sees either the old brand or the new one.
+        """
+        year_index = {key: index for key, index in self.year_index.items() if key[0] != make}
+        year_index.update(brand["year_index"])
+        search_index = typeahead = matrix = None
+        if rebuild_search and self._search_index is not None:
+            search_index = SearchIndex(order_by_brand(year_index))
+        if rebuild_search and self._typeahead is not None:
+            typeahead = TypeAhead(typeahead_rows(order_by_brand(year_index)))
+        if rebuild_search and self.matrix is not None:
+            matrix = ResolutionMatrix(order_by_brand(year_index), KEY_STATUSES)
+
+        with self._lock:
+            self.year_index = year_index
+            self._files[make] = brand["data"]
+            self._tool_refs[make] = brand["tools"]
+            self._warnings_by_make[make] = brand["warnings"]
+            self.manifest[make] = brand["models"]
+            if brand["stat"] is not None:
+                self._manifest_stats[make] = brand["stat"]
+            if self._parts_index is not None:
+                self._parts_index.update_make(make, [
+                    (model, year_range, info)
+                    for (_make, model), index in brand["year_index"].items()
+                    for year_range, info in index.entries
+                ])
+            self._search_index = search_index
+            self._typeahead = typeahead
+            self.matrix = matrix
+
+    def reload_brand(self, make):
+        """Re-parse one brand file and swap it in, keeping the old data on failure
+
+        Returns {"make", "ok", "seconds", "error", "warnings"}.
+        """
+        start = time.perf_counter()
+        try:
+            brand = parse_brand(self.db_folder, make)
+        except BrandLoadError as e:
+            self.load_errors[make] = str(e)
+            return {"make": make, "ok": False, "seconds": time.perf_counter() - start,
+                    "error": str(e), "warnings": []}
+        self._install_brand(make, brand, rebuild_search=True)
+        self.load_errors.pop(make, None)
+        self._save_manifest()
+        return {"make": make, "ok": True, "seconds": time.perf_counter() - start,
+                "error": None, "warnings": brand["warnings"]}
+
+    def _save_manifest(self):
+        entries = {
+            make: {"file": BRAND_FILES[make], "root_key": ROOT_KEYS[make], "stat": list(stat),
+                   "models": self.manifest[make]}
+            for make, stat in self._manifest_stats.items()
+        }
+        write_manifest(self.db_folder, entries)
+
+    def ensure_brand(self, make):
+        """Parse make's brand file if it hasn't been yet"""
+        if self._files.get(make, {}) is None:
+            with self._lock:
+                if self._files.get(make) is None:
+                    if trace.ENABLED:
+                        trace.count("brand.lazy_load")
+                    self._load_brand(make)
+
+    def ensure_all_loaded(self):
+        self.load_brands()
+
+    def build_matrix(self):
+        """Resolve and format every make/model/year/key status up front"""
+        self.ensure_all_loaded()
+        self.matrix = ResolutionMatrix(self.ordered_year_index(), KEY_STATUSES)
+        return self.matrix
+
+    def ordered_year_index(self):
+        """year_index in BRAND_FILES order, whatever order brands were loaded in"""
+        return order_by_brand(self.year_index)
+
+    def loaded_makes(self):
+        return [make for make, data in self._files.items() if data is not None]
+
+    @property
+    def index_warnings(self):
+        """Bad year ranges, overlaps and gaps found in the loaded brands"""
+        return [w for warnings in self._warnings_by_make.values() for w in warnings]
+
+    @property
+    def search_index(self):
+        if self._search_index is None:
+            with self._lock:
+                self.ensure_all_loaded()
+                if self._search_index is None:
+                    self._search_index = SearchIndex(self.ordered_year_index())
+        return self._search_index
+
+    @property
+    def typeahead(self):
+        if self._typeahead is None:
+            with self._lock:
+                self.ensure_all_loaded()
+                if self._typeahead is None:
+                    self._typeahead = TypeAhead(typeahead_rows(self.ordered_year_index()))
+        return self._typeahead
+
+    @property
+    def parts_index(self):
+        if self._parts_index is None:
+            with self._lock:
+                self.ensure_all_loaded()
+                if self._parts_index is None:
+                    parts = PartsIndex()
+                    entries = {}
+                    for (make, model), index in self.ordered_year_index().items():
+                        entries.setdefault(make, []).extend(
+                            (model, year_range, info) for year_range, info in index.entries
+                        )
+                    for make, make_entries in entries.items():
+                        parts.update_make(make, make_entries)
+                    self._parts_index = parts
+        return self._parts_index
+
+    def brand_data(self, make):
+        """make's parsed brand file, minus its tool_reference block"""
+        self.ensure_brand(make)
+        return self._files.get(make) or {}
+
+    def warnings_by_make(self):
+        return dict(self._warnings_by_make)
+
+    def tool_references(self, make):
+        """All tool reference blocks shipped with a brand file"""
+        self.ensure_brand(make)
+        return self._tool_refs.get(make, {})
+
+    def tool_reference(self, make, name):
+        """One tool reference block (e.g. "xhorse_mlb_tool"), or None"""
+        return self.tool_references(make).get(name)
+
+    def record_tools(self, make, info):
+        """Tool reference blocks a record's xhorse_tool_support flags point at"""
+        support = info.get("xhorse_tool_support", {})
+        names = [name for flag, name in TOOL_REFERENCE_FLAGS.items() if support.get(flag)]
+        if not names:
+            return []
+        tools = self.tool_references(make)
+        return [tools[name] for name in names if name in tools]
+
+    def load_json(self, filename):
+        """Load a JSON file, return empty dict if not found or unreadable (see load_errors)"""
+        path = os.path.join(self.db_folder, filename)
+        if os.path.exists(path):
+            try:
+                return read_json(path)
+            except BrandLoadError as e:
+                self.load_errors[filename] = str(e)
+                return {}
+        return {}
+
+    def get_models_for_make(self, make):
+        """Get available models for a make"""
+        return sorted(self.manifest.get(make, []))
+
+    def model_counts(self):
+        """Number of models per make, for the stats panel"""
+        return {make: len(self.manifest.get(make, [])) for make in BRAND_FILES}
+
+    @trace.traced("resolve_vehicle")
+    def resolve_vehicle(self, make, model, year, key_status):
+        """Resolve vehicle data from database"""
+        self.ensure_brand(make)
+        index = self.year_index.get((make, model))
+        if index is None:
+            return None
+
+        i = index.position(year)
+        if i < 0:
+            return None
+        status = STATUS_POSITION.get(key_status)
+        if status is None:
+            year_range, info = index.entries[i]
+            return build_record(info, year_range, key_status)
+        return index.records[i][status]
+
+    def resolve_display(self, make, model, year, key_status):
+        """(record, format_result(record)) or None; a direct index when the matrix is built"""
+        matrix = self.matrix
+        if matrix is not None:
+            hit = matrix.lookup(make, model, year, key_status)
+            if hit is not None:
+                return hit
+        record = self.resolve_vehicle(make, model, year, key_status)
+        return (record, format_result(record)) if record else None
+
+    def search(self, query="", **facets):
+        """Full-text + facet search, see SearchIndex.search"""
+        return self.search_index.search(query, **facets)
+
+    def vehicles_using(self, field, value):
+        """(make, model, year_range) for every record using a key blade, immobilizer or chip"""
+        return self.parts_index.lookup(field, value)
+
+    # =======================
+    # VIN Tools
+    # =======================
+    def validate_vin(self, vin):
+        """Validate VIN and extract info"""
+        return decode_vin(vin)
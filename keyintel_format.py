@@ -0,0 +1,161 @@
+"""
+CyberNinja Luxury Key Intelligence - Result Formatting
+Theme colours and the text/colour rules for the results panel, kept free
+of GUI imports so the same display strings can be produced headlessly.
+"""
+
+# Custom colors - matching Cluster ID
+CYBER_CYAN = "#00ffff"
+CYBER_GREEN = "#00ff00"
+CYBER_MAGENTA = "#ff00ff"
+CYBER_DARK = "#0a0a0f"
+CYBER_PANEL = "#12121a"
+CYBER_ACCENT = "#00ffcc"
+CYBER_RED = "#ff0066"
+CYBER_YELLOW = "#ffcc00"
+CYBER_ORANGE = "#ff9900"
+CYBER_BLUE = "#0099ff"
+
+# Risk colors
+RISK_LOW = "#00ff00"
+RISK_MEDIUM = "#ffcc00"
+RISK_HIGH = "#ff6600"
+RISK_VERY_HIGH = "#ff0066"
+
+# Default value text colour in the results panel
+TEXT_DEFAULT = "#e6e6e6"
+
+# The app's year menu; the resolution matrix and benchmarks cover the same span
+MENU_FIRST_YEAR = 2005
+MENU_LAST_YEAR = 2026
+
+# Results panel label -> resolved record key
+FIELD_MAP = {
+    "Platform / Chassis": "platform",
+    "Immobilizer System": "immobilizer",
+    "Key Type": "key_type",
+    "Key Blade": "key_blade",
+    "Programming Method": "programming",
+    "Module Removal": "module_removal",
+    "AKL Supported": "akl_supported",
+    "Risk Level": "risk_level",
+    "EEPROM Chip": "eeprom_chip",
+    "Backup Method": "backup_method",
+    "⚠️ BACKUP WARNING": "backup_warning",
+    "Notes": "notes"
+}
+
+# Risk indicator when nothing (or nothing recognisable) is shown
+RISK_NONE = (0, "—", CYBER_GREEN)
+
+
+def risk_display(value):
+    """(bar value, label, colour) for a risk level string"""
+    if "Low" in value:
+        return (0.25, "LOW", RISK_LOW)
+    elif "Medium" in value:
+        return (0.5, "MEDIUM", RISK_MEDIUM)
+    elif "Very High" in value:
+        return (1.0, "VERY HIGH", RISK_VERY_HIGH)
+    elif "High" in value:
+        return (0.75, "HIGH", RISK_HIGH)
+    return RISK_NONE
+
+
+def field_color(display_name, value):
+    """Text colour for one results panel field"""
+    if display_name == "Risk Level":
+        bar, _label, color = risk_display(value)
+        return color if bar else TEXT_DEFAULT
+
+    elif display_name == "Module Removal":
+        return CYBER_YELLOW if value == "Yes" else CYBER_GREEN
+
+    elif display_name == "AKL Supported":
+        if value == "Yes":
+            return CYBER_GREEN
+        elif "Limited" in value or "Very" in value:
+            return CYBER_YELLOW
+        elif value == "No" or "dealer" in value.lower():
+            return CYBER_RED
+
+    # Color code EEPROM backup warning
+    elif display_name == "⚠️ BACKUP WARNING":
+        if value and "CRITICAL" in value:
+            return CYBER_RED
+        elif value and "EXTREME" in value:
+            return CYBER_RED
+        elif value and "IMPORTANT" in value:
+            return CYBER_ORANGE
+        elif value:
+            return CYBER_YELLOW
+        else:
+            return CYBER_GREEN
+
+    return TEXT_DEFAULT
+
+
+def xhorse_tools_text(result):
+    """Build Xhorse tool support text"""
+    text = ""
+    mlb = result.get("mlb_tool", False)
+    mqb = result.get("mqb_adapter", False)
+
+    if mlb == True:
+        text += "✅ MLB Tool (XDMLB0): SUPPORTED\n"
+    elif mlb == "Limited" or mlb == "Verify":
+        text += f"⚠️ MLB Tool: {mlb}\n"
+    else:
+        text += "❌ MLB Tool: Not applicable\n"
+
+    if mqb == True:
+        text += "✅ MQB Adapter (XDMQBAGL): SUPPORTED"
+    elif mqb == "Limited":
+        text += "⚠️ MQB Adapter: Limited support"
+    else:
+        text += "❌ MQB Adapter: Not applicable"
+
+    if result.get("recommended_tool"):
+        text += f"\n🎯 Recommended: {result.get('recommended_tool')}"
+    return text
+
+
+def xhorse_workflow_text(result):
+    """Build Xhorse workflow text"""
+    text = ""
+    if result.get("xhorse_notes"):
+        text = result.get("xhorse_notes", "")
+    if result.get("xhorse_workflow"):
+        if text:
+            text += "\n"
+        text += result.get("xhorse_workflow", "")
+    if not text:
+        text = "Standard procedures apply"
+    return text
+
+
+def quick_info_text(result):
+    blade = result.get("key_blade", "—")
+    immo = result.get("immobilizer", "—")
+    eeprom = result.get("eeprom_chip", "N/A")
+    backup_req = "⚠️ YES" if result.get("backup_required", False) else "✓ Optional"
+    return f"Blade: {blade}\nSystem: {immo}\nEEPROM: {eeprom}\nBackup: {backup_req}"
+
+
+def format_result(result):
+    """Turn a resolved record into everything the results panel displays
+
+    Returns {"fields": {label: (text, colour)}, "risk": (bar, text, colour),
+    "quick_info": text}.
+    """
+    fields = {}
+    for display_name, key in FIELD_MAP.items():
+        value = result.get(key, "—")
+        fields[display_name] = (value, field_color(display_name, value))
+    fields["🔧 XHORSE TOOL SUPPORT"] = (xhorse_tools_text(result), CYBER_BLUE)
+    fields["📋 XHORSE WORKFLOW"] = (xhorse_workflow_text(result), CYBER_ACCENT)
+    return {
+        "fields": fields,
+        "risk": risk_display(result.get("risk_level", "")),
+        "quick_info": quick_info_text(result)
+    }
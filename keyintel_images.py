@@ -0,0 +1,129 @@
+"""
+CyberNinja Luxury Key Intelligence - Reference Image Store
+Directory index and on-disk thumbnail cache for Key_Images. Thread-safe
+enough to run thumbnail work on a pool while the GUI stays responsive.
+Pillow is only imported when an image is first decoded or saved.
+"""
+
+import hashlib
+import os
+import threading
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".gif")
+THUMB_SIZE = (220, 180)
+THUMB_DIR = ".thumbs"
+
+# Stored reference images are flattened JPEGs no larger than this
+STORED_SIZE = (800, 800)
+STORED_QUALITY = 85
+
+
+def image_stem(make, model, year_range, img_type):
+    """File name (without extension) for a vehicle reference image"""
+    img_key = f"{make}_{model}_{year_range}".replace(" ", "_").replace("/", "-")
+    return f"{img_key}_{img_type}"
+
+
+class ImageIndex:
+    """Stem -> path map of the images folder, rescanned only when the folder changes"""
+
+    def __init__(self, images_dir):
+        self.images_dir = images_dir
+        self._dir_mtime = None
+        self._paths = {}
+        self._lock = threading.Lock()
+
+    def refresh(self):
+        try:
+            mtime = os.stat(self.images_dir).st_mtime_ns
+        except OSError:
+            self._paths = {}
+            self._dir_mtime = None
+            return
+        if mtime == self._dir_mtime:
+            return
+        with self._lock:
+            paths = {}
+            rank = {ext: i for i, ext in enumerate(IMAGE_EXTENSIONS)}
+            with os.scandir(self.images_dir) as entries:
+                for entry in entries:
+                    stem, ext = os.path.splitext(entry.name)
+                    ext = ext.lower()
+                    if ext not in rank or not entry.is_file():
+                        continue
+                    # Same preference order as the old per-extension probe
+                    current = paths.get(stem)
+                    if current is None or rank[ext] < rank[os.path.splitext(current)[1].lower()]:
+                        paths[stem] = entry.path
+            self._paths = paths
+            self._dir_mtime = mtime
+
+    def find(self, stem):
+        """Path of the image for stem, or None"""
+        self.refresh()
+        return self._paths.get(stem)
+
+
+def thumbnail_cache_path(images_dir, path, mtime_ns):
+    key = f"{os.path.abspath(path)}|{mtime_ns}|{THUMB_SIZE[0]}x{THUMB_SIZE[1]}"
+    digest = hashlib.sha1(key.encode("utf-8")).hexdigest()
+    return os.path.join(images_dir, THUMB_DIR, f"{digest}.png")
+
+
+def load_thumbnail(images_dir, path, mtime_ns=None):
+    """Return a THUMB_SIZE PIL image for path, using the on-disk thumbnail cache"""
+    from PIL import Image
+
+    if mtime_ns is None:
+        mtime_ns = os.stat(path).st_mtime_ns
+    cache_path = thumbnail_cache_path(images_dir, path, mtime_ns)
+
+    if os.path.exists(cache_path):
+        try:
+            img = Image.open(cache_path)
+            img.load()
+            return img
+        except OSError:
+            pass
+
+    img = Image.open(path)
+    img.thumbnail(THUMB_SIZE)
+    if img.mode not in ("RGB", "RGBA", "L", "LA", "P"):
+        img = img.convert("RGB")
+    try:
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        tmp_path = f"{cache_path}.{threading.get_ident()}.tmp"
+        img.save(tmp_path, "PNG")
+        os.replace(tmp_path, cache_path)
+    except OSError:
+        # A read-only images folder just means no disk cache
+        pass
+    return img
+
+
+def flatten_to_rgb(img):
+    """Composite transparency onto white and return an RGB image"""
+    from PIL import Image
+
+    if img.mode in ('RGBA', 'LA', 'P'):
+        background = Image.new('RGB', img.size, (255, 255, 255))
+        if img.mode == 'P':
+            img = img.convert('RGBA')
+        if img.mode in ('RGBA', 'LA'):
+            background.paste(img, mask=img.split()[-1])
+        else:
+            background.paste(img)
+        return background
+    elif img.mode != 'RGB':
+        return img.convert('RGB')
+    return img
+
+
+def save_reference_image(src_path, dest_path):
+    """Flatten, downscale and JPEG-encode src_path into dest_path, return the stored image"""
+    from PIL import Image
+
+    img = flatten_to_rgb(Image.open(src_path))
+    img.thumbnail(STORED_SIZE, Image.Resampling.LANCZOS)
+    img.save(dest_path, "JPEG", quality=STORED_QUALITY)
+    return img
@@ -0,0 +1,263 @@
+"""
+CyberNinja Luxury Key Intelligence - Bulk Image Import
+Import a folder of reference photos into Key_Images in one go.
+
+File names are matched to vehicles loosely, e.g. "BMW X5 2020 key.jpg",
+"audi_a4_2017_bcm.png" or "VW-Golf-R-2019-fob.jpeg" all work: make, then
+model, then any year inside the wanted range, then "key"/"fob" for key
+photos (anything else is filed as a module photo).
+
+Imports are resumable and idempotent: every imported file's content hash
+is appended to Key_Images/.import_manifest.jsonl, and files whose hash is
+already listed are skipped on the next run.
+
+    python keyintel_import.py ~/Photos/new_brand --workers 4
+    python keyintel_import.py ~/Photos/new_brand --dry-run
+"""
+
+import argparse
+import hashlib
+import json
+import multiprocessing
+import os
+import re
+import sys
+import time
+
+from keyintel_brands import MAKE_ALIASES
+from keyintel_engine import KeyIntelEngine, DEFAULT_DB_FOLDER
+from keyintel_images import image_stem, save_reference_image
+
+DEFAULT_IMAGES_DIR = "Key_Images"
+MANIFEST_FILENAME = ".import_manifest.jsonl"
+SOURCE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".gif", ".bmp", ".webp", ".tif", ".tiff")
+
+KEY_WORDS = ("key", "fob", "remote")
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+YEAR_RE = re.compile(r"(19|20)\d{2}")
+
+
+def normalize(text):
+    return re.sub(r"[^a-z0-9]", "", text.lower())
+
+
+def tokens_of(filename):
+    """Lowercased alphanumeric runs of a file name, without its extension"""
+    return TOKEN_RE.findall(os.path.splitext(os.path.basename(filename))[0].lower())
+
+
+def consume(tokens, start, norm):
+    """Index past the whole tokens from start that spell norm, or None"""
+    joined = ""
+    for i in range(start, len(tokens)):
+        joined += tokens[i]
+        if joined == norm:
+            return i + 1
+        if not norm.startswith(joined):
+            return None
+    return None
+
+
+def file_sha256(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 16), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+# =======================
+# File Name Matching
+# =======================
+class NameMatcher:
+    """Map loose photo file names onto {make}_{model}_{year_range}_{type} stems"""
+
+    def __init__(self, engine):
+        self.engine = engine
+        # Longest alias first so "mercedesbenz" wins over "mercedes"
+        self.makes = sorted(MAKE_ALIASES.items(), key=lambda item: -len(item[0]))
+        self.models = {}
+        for make in set(MAKE_ALIASES.values()):
+            models = [(normalize(m), m) for m in engine.get_models_for_make(make)]
+            self.models[make] = sorted(models, key=lambda item: -len(item[0]))
+
+    def match(self, filename):
+        """Return the target stem for filename, or None if it can't be placed"""
+        tokens = tokens_of(filename)
+
+        make = pos = None
+        for alias, name in self.makes:
+            pos = consume(tokens, 0, alias)
+            if pos is not None:
+                make = name
+                break
+        if make is None:
+            return None
+
+        model = None
+        for norm, name in self.models.get(make, []):
+            end = consume(tokens, pos, norm) if norm else None
+            if end is not None:
+                model, pos = name, end
+                break
+        if model is None:
+            return None
+
+        # Only a whole token is a year, so "W205 2016" doesn't read as 2052
+        year_pos = next((i for i in range(pos, len(tokens)) if YEAR_RE.fullmatch(tokens[i])), None)
+        if year_pos is None:
+            return None
+        result = self.engine.resolve_vehicle(make, model, int(tokens[year_pos]), "has_key")
+        if result is None:
+            return None
+
+        rest = tokens[year_pos + 1:]
+        img_type = "key" if any(word in rest for word in KEY_WORDS) else "module"
+        return image_stem(make, model, result["year_range"], img_type)
+
+
+# =======================
+# Manifest
+# =======================
+def read_manifest(images_dir):
+    """Content hashes of every previously imported file"""
+    path = os.path.join(images_dir, MANIFEST_FILENAME)
+    hashes = set()
+    if not os.path.exists(path):
+        return hashes
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                hashes.add(json.loads(line)["sha256"])
+            except (ValueError, KeyError, TypeError):
+                continue  # Torn last line from an interrupted run
+    return hashes
+
+
+# =======================
+# Worker
+# =======================
+def _hash_one(src):
+    try:
+        return src, file_sha256(src), ""
+    except OSError as e:
+        return src, None, str(e)
+
+
+def _import_one(task):
+    src, dest, digest, overwrite = task
+    try:
+        if os.path.exists(dest) and not overwrite:
+            return ("conflict", src, dest, digest, "target exists (use --overwrite)")
+        # Per-process temp name, so two import runs never write the same file
+        tmp = f"{dest}.{os.getpid()}.tmp"
+        try:
+            save_reference_image(src, tmp)
+            os.replace(tmp, dest)
+        finally:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+        return ("imported", src, dest, digest, "")
+    except Exception as e:
+        return ("failed", src, dest, digest, str(e))
+
+
+def import_folder(folder, images_dir, engine, workers=1, overwrite=False,
+                  dry_run=False, progress=None):
+    """Import every matching photo in folder. Returns a {status: count} summary."""
+    os.makedirs(images_dir, exist_ok=True)
+    matcher = NameMatcher(engine)
+    summary = {"imported": 0, "skipped": 0, "conflict": 0, "failed": 0, "unmatched": 0}
+
+    def report(status, src, dest, detail):
+        summary[status] += 1
+        if progress:
+            progress(status, src, dest, detail)
+
+    targets = {}
+    for name in sorted(os.listdir(folder)):
+        src = os.path.join(folder, name)
+        if not os.path.isfile(src) or os.path.splitext(name)[1].lower() not in SOURCE_EXTENSIONS:
+            continue
+        stem = matcher.match(name)
+        if stem is None:
+            report("unmatched", src, None, "could not map file name to a vehicle")
+            continue
+        targets[src] = os.path.join(images_dir, stem + ".jpg")
+
+    if dry_run:
+        for src, dest in targets.items():
+            if progress:
+                progress("would import", src, dest, "")
+        return summary
+
+    known = read_manifest(images_dir)
+    manifest_path = os.path.join(images_dir, MANIFEST_FILENAME)
+    with open(manifest_path, "a", encoding="utf-8") as manifest, \
+            multiprocessing.Pool(max(1, workers)) as pool:
+        # Dedupe in the parent, so no two tasks share a target or a content hash
+        tasks = []
+        claimed = {}
+        queued = {}
+        for src, digest, error in pool.imap(_hash_one, list(targets)):
+            dest = targets[src]
+            if digest is None:
+                report("failed", src, dest, error)
+            elif digest in known:
+                report("skipped", src, dest, "already imported")
+            elif digest in queued:
+                report("skipped", src, dest, f"same photo as {os.path.basename(queued[digest])}")
+            elif dest in claimed:
+                report("conflict", src, dest, f"same target as {os.path.basename(claimed[dest])}")
+            else:
+                queued[digest] = src
+                claimed[dest] = src
+                tasks.append((src, dest, digest, overwrite))
+
+        for status, src, dest, digest, detail in pool.imap_unordered(_import_one, tasks):
+            if status == "imported":
+                manifest.write(json.dumps({
+                    "sha256": digest,
+                    "source": os.path.basename(src),
+                    "target": os.path.basename(dest),
+                    "imported_at": time.strftime("%Y-%m-%dT%H:%M:%S")
+                }) + "\n")
+                manifest.flush()
+            report(status, src, dest, detail)
+    return summary
+
+
+# =======================
+# Main Entry Point
+# =======================
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bulk-import reference photos into Key_Images")
+    parser.add_argument("folder", help="Folder of photos to import")
+    parser.add_argument("--images-dir", default=DEFAULT_IMAGES_DIR, help="Reference image folder")
+    parser.add_argument("--db", default=DEFAULT_DB_FOLDER, help="Brand database folder")
+    parser.add_argument("--workers", type=int, default=0, help="Worker processes (0 = one per CPU)")
+    parser.add_argument("--overwrite", action="store_true", help="Replace existing images for a vehicle")
+    parser.add_argument("--dry-run", action="store_true", help="Show the file mapping without importing")
+    args = parser.parse_args(argv)
+
+    workers = args.workers if args.workers > 0 else (os.cpu_count() or 1)
+    engine = KeyIntelEngine(args.db)
+    done = [0]
+
+    def progress(status, src, dest, detail):
+        done[0] += 1
+        target = f" -> {os.path.basename(dest)}" if dest else ""
+        note = f" ({detail})" if detail else ""
+        print(f"[{done[0]}] {status}: {os.path.basename(src)}{target}{note}", file=sys.stderr)
+
+    start = time.perf_counter()
+    summary = import_folder(args.folder, args.images_dir, engine, workers,
+                            overwrite=args.overwrite, dry_run=args.dry_run, progress=progress)
+    elapsed = time.perf_counter() - start
+    print(", ".join(f"{k}: {v}" for k, v in summary.items()) + f" in {elapsed:.1f}s", file=sys.stderr)
+    return 1 if summary["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
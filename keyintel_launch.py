@@ -0,0 +1,42 @@
+"""
+CyberNinja Luxury Key Intelligence - Launcher Helpers
+Dependency check without importing the packages or running pip, and the
+startup clock behind the time-to-first-paint report.
+
+    python CyberNinja_LuxuryKeyIntel.py --startup-time   # print timings, then exit
+"""
+
+import importlib.util
+import subprocess
+import sys
+import time
+
+# Module name -> pip package that provides it
+REQUIRED_MODULES = {
+    "customtkinter": "customtkinter",
+    "PIL": "Pillow"
+}
+
+# Set when this module is first imported, i.e. right at the top of the app
+LAUNCH_TIME = time.perf_counter()
+
+
+def missing_packages(required=REQUIRED_MODULES):
+    """pip packages whose module isn't installed; finds specs, imports nothing"""
+    return [package for module, package in required.items()
+            if importlib.util.find_spec(module) is None]
+
+
+def ensure_dependencies(required=REQUIRED_MODULES):
+    """Install missing packages; pip only runs when something is actually missing"""
+    missing = missing_packages(required)
+    if missing:
+        print(f"Installing missing packages: {missing}")
+        for package in missing:
+            subprocess.check_call([sys.executable, "-m", "pip", "install", package])
+        importlib.invalidate_caches()
+    return missing
+
+
+def elapsed_ms(since=LAUNCH_TIME):
+    return (time.perf_counter() - since) * 1000
@@ -0,0 +1,64 @@
+"""
+CyberNinja Luxury Key Intelligence - Resolution Matrix
+Every make x model x menu year x key status the app can ask for,
+resolved and formatted ahead of time. A lookup is a dict hit for the
+(make, model) row plus one array index; nothing is resolved or formatted
+while the user clicks through the menus.
+
+    engine = KeyIntelEngine("data", matrix=True)
+    record, display = engine.resolve_display("BMW", "X5", 2020, "akl")
+
+    python keyintel_snapshot.py --db data --matrix   # ship it in the snapshot
+"""
+
+from array import array
+
+from keyintel_format import MENU_FIRST_YEAR, MENU_LAST_YEAR, format_result
+
+
+class ResolutionMatrix:
+    """Dense (make, model) x year x key status table of (record, display) pairs"""
+
+    def __init__(self, year_index, key_statuses, first_year=MENU_FIRST_YEAR, last_year=MENU_LAST_YEAR):
+        self.first_year = first_year
+        self.years = last_year - first_year + 1
+        self.key_statuses = tuple(key_statuses)
+        self.status_position = {ks: i for i, ks in enumerate(self.key_statuses)}
+        statuses = len(self.key_statuses)
+
+        # (make, model) -> row; cells hold 1-based slots into entries, 0 = no data
+        self.rows = {}
+        self.entries = []
+        self.cells = array("I", bytes(4 * len(year_index) * self.years * statuses))
+        slots = {}
+
+        for row, ((make, model), index) in enumerate(year_index.items()):
+            self.rows[(make, model)] = row
+            base = row * self.years * statuses
+            for y in range(self.years):
+                i = index.position(first_year + y)
+                if i < 0:
+                    continue
+                for s in range(statuses):
+                    record = index.records[i][s]
+                    slot = slots.get(id(record))
+                    if slot is None:
+                        # One (record, display) per year range and status,
+                        # shared by every year the range covers
+                        self.entries.append((record, format_result(record)))
+                        slot = slots[id(record)] = len(self.entries)
+                    self.cells[base + y * statuses + s] = slot
+
+    def lookup(self, make, model, year, key_status):
+        """(record, display), or None if there's no data or it's outside the table"""
+        row = self.rows.get((make, model))
+        status = self.status_position.get(key_status)
+        y = year - self.first_year
+        if row is None or status is None or not 0 <= y < self.years:
+            return None
+        slot = self.cells[(row * self.years + y) * len(self.key_statuses) + status]
+        return self.entries[slot - 1] if slot else None
+
+    def stats(self):
+        return {"rows": len(self.rows), "cells": len(self.cells), "entries": len(self.entries),
+                "bytes": self.cells.itemsize * len(self.cells)}
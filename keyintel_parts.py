@@ -0,0 +1,164 @@
+"""
+CyberNinja Luxury Key Intelligence - Parts Reverse Index
+Key blade / immobilizer / EEPROM chip -> every make, model and year range
+that uses it, for stock planning. Built once at load and updated one make
+at a time when a brand is reloaded.
+
+    python keyintel_parts.py --field key_blade                # blade summary
+    python keyintel_parts.py --field key_blade --value HU100R
+    python keyintel_parts.py --csv parts.csv                  # full export
+"""
+
+import argparse
+import csv
+import re
+import sys
+
+PART_FIELDS = ("key_blade", "immobilizer", "chip_type")
+
+# Values that don't name an orderable part
+IGNORED_VALUES = {"n/a", "na", "none", "emergency", "not applicable", "unknown", ""}
+
+_PAREN_RE = re.compile(r"\([^)]*\)")
+_SPLIT_RE = re.compile(r"\s*(?:/|,|\bor\b)\s*", re.IGNORECASE)
+_CHIP_RE = re.compile(r"\b9[35]\d{3}\b")
+
+
+def part_values(field, text):
+    """Split a record's field into individual part names"""
+    if not isinstance(text, str):
+        return []
+    lowered = text.strip().lower()
+    if lowered.startswith("n/a") or lowered.startswith("not applicable"):
+        return []
+    if field == "chip_type":
+        # Prefer concrete EEPROM part numbers like 95128 / 95256 when present
+        chips = _CHIP_RE.findall(text)
+        if chips:
+            return list(dict.fromkeys(chips))
+        cleaned = _PAREN_RE.sub("", text).strip()
+        return [cleaned] if cleaned.lower() not in IGNORED_VALUES else []
+
+    values = []
+    for part in _SPLIT_RE.split(_PAREN_RE.sub("", text)):
+        part = part.strip()
+        if part.lower() not in IGNORED_VALUES and part not in values:
+            values.append(part)
+    return values
+
+
+def record_parts(info):
+    """{field: [values]} for one year-range record"""
+    return {
+        "key_blade": part_values("key_blade", info.get("key_blade", "")),
+        "immobilizer": part_values("immobilizer", info.get("immobilizer", "")),
+        "chip_type": part_values("chip_type", info.get("eeprom_info", {}).get("chip_type", ""))
+    }
+
+
+class PartsIndex:
+    """Reverse maps field -> value -> [(make, model, year_range)]
+
+    Values are matched case-insensitively, so "HU100R" and "hu100r" are one
+    part; it is shown with the spelling most rows use.
+    """
+
+    def __init__(self):
+        # field -> lowercased value -> rows
+        self.maps = {field: {} for field in PART_FIELDS}
+        # field -> lowercased value -> {spelling: rows using it}
+        self._spelling = {field: {} for field in PART_FIELDS}
+        # make -> [(field, value, row)] so a make can be swapped out alone
+        self._rows_by_make = {}
+
+    def update_make(self, make, entries):
+        """Replace everything indexed for make with entries of (model, year_range, info)"""
+        self.remove_make(make)
+        added = []
+        for model, year_range, info in entries:
+            row = (make, model, year_range)
+            for field, values in record_parts(info).items():
+                for value in values:
+                    key = value.lower()
+                    self.maps[field].setdefault(key, []).append(row)
+                    spellings = self._spelling[field].setdefault(key, {})
+                    spellings[value] = spellings.get(value, 0) + 1
+                    added.append((field, value, row))
+        self._rows_by_make[make] = added
+
+    def remove_make(self, make):
+        for field, value, row in self._rows_by_make.pop(make, []):
+            key = value.lower()
+            rows = self.maps[field].get(key)
+            if rows is None:
+                continue
+            rows.remove(row)
+            if not rows:
+                del self.maps[field][key]
+            spellings = self._spelling[field].get(key, {})
+            spellings[value] = spellings.get(value, 1) - 1
+            if spellings[value] <= 0:
+                del spellings[value]
+            if not spellings:
+                self._spelling[field].pop(key, None)
+
+    def makes(self):
+        return list(self._rows_by_make)
+
+    def display(self, field, key):
+        """The spelling of a lowercased value that most rows use"""
+        spellings = self._spelling[field].get(key)
+        return max(spellings, key=spellings.get) if spellings else key
+
+    def lookup(self, field, value):
+        """Every (make, model, year_range) using value (case-insensitive)"""
+        return list(self.maps[field].get(value.lower(), []))
+
+    def summary(self, field):
+        """[(value, vehicle count)] sorted by most used"""
+        return sorted(((self.display(field, key), len(rows)) for key, rows in self.maps[field].items()),
+                      key=lambda item: (-item[1], item[0]))
+
+    def export_csv(self, stream, fields=PART_FIELDS):
+        """Write field,value,make,model,year_range rows"""
+        writer = csv.writer(stream)
+        writer.writerow(["field", "value", "make", "model", "year_range"])
+        for field in fields:
+            for key in sorted(self.maps[field]):
+                value = self.display(field, key)
+                for make, model, year_range in self.maps[field][key]:
+                    writer.writerow([field, value, make, model, year_range])
+
+
+# =======================
+# Main Entry Point
+# =======================
+def main(argv=None):
+    from keyintel_engine import KeyIntelEngine, DEFAULT_DB_FOLDER
+
+    parser = argparse.ArgumentParser(description="Stock planning: which vehicles use each part")
+    parser.add_argument("--db", default=DEFAULT_DB_FOLDER, help="Brand database folder")
+    parser.add_argument("--field", choices=PART_FIELDS, default="key_blade")
+    parser.add_argument("--value", help="List the vehicles for one part")
+    parser.add_argument("--csv", help="Export every field/value/vehicle row to this CSV file ('-' for stdout)")
+    args = parser.parse_args(argv)
+
+    parts = KeyIntelEngine(args.db).parts_index
+
+    if args.csv:
+        if args.csv == "-":
+            parts.export_csv(sys.stdout)
+        else:
+            with open(args.csv, "w", encoding="utf-8", newline="") as f:
+                parts.export_csv(f)
+    elif args.value:
+        for make, model, year_range in parts.lookup(args.field, args.value):
+            print(f"{make} {model} {year_range}")
+    else:
+        for value, count in parts.summary(args.field):
+            print(f"{value}: {count}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,126 @@
+"""
+CyberNinja Luxury Key Intelligence - Brand Hot Reload
+Watch the brand JSON files and swap a changed brand into a running engine
+without a restart. Only the changed brand is re-parsed, on a background
+thread; if the new file doesn't parse or validate, the previous data stays
+live and the error is reported.
+
+    python keyintel_reload.py --db data        # watch and log reloads
+"""
+
+import argparse
+import os
+import sys
+import threading
+import time
+from collections import deque
+
+from keyintel_engine import BRAND_FILES, DEFAULT_DB_FOLDER, KeyIntelEngine, file_stat
+
+# How often brand files are stat'ed. Polling keeps this stdlib-only and
+# works the same on every platform and on network shares.
+RELOAD_POLL_SECONDS = 2.0
+RELOAD_HISTORY = 20
+
+
+class BrandWatcher:
+    """Polls brand file mtimes and hot-swaps changed brands into an engine"""
+
+    def __init__(self, engine, interval=RELOAD_POLL_SECONDS, on_reload=None):
+        self.engine = engine
+        self.interval = interval
+        # Called from the watcher thread with each reload result dict
+        self.on_reload = on_reload
+        self.history = deque(maxlen=RELOAD_HISTORY)
+        self._stats = {make: self._stat(make) for make in BRAND_FILES}
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _stat(self, make):
+        return file_stat(os.path.join(self.engine.db_folder, BRAND_FILES[make]))
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="keyintel-reload", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.check()
+
+    def check(self):
+        """One polling pass; reloads every brand whose file changed, returns the results"""
+        results = []
+        for make in BRAND_FILES:
+            stat = self._stat(make)
+            if stat == self._stats[make]:
+                continue
+            self._stats[make] = stat
+            if stat is None:
+                # Deleted (or mid-replace): keep serving what we have
+                continue
+            result = self.engine.reload_brand(make)
+            self.history.append(result)
+            results.append(result)
+            if self.on_reload is not None:
+                self.on_reload(result)
+        return results
+
+    def last_errors(self):
+        """{make: error} for brands whose latest reload failed"""
+        latest = {}
+        for result in self.history:
+            latest[result["make"]] = result["error"]
+        return {make: error for make, error in latest.items() if error}
+
+
+def describe(result):
+    """One-line summary of a reload result"""
+    ms = result["seconds"] * 1000
+    if not result["ok"]:
+        return f"{result['make']}: reload failed after {ms:.1f} ms, keeping previous data ({result['error']})"
+    text = f"{result['make']}: reloaded in {ms:.1f} ms"
+    if result["warnings"]:
+        text += f" ({len(result['warnings'])} warning(s))"
+    return text
+
+
+# =======================
+# Main Entry Point
+# =======================
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Watch brand files and log hot reloads")
+    parser.add_argument("--db", default=DEFAULT_DB_FOLDER, help="Brand database folder")
+    parser.add_argument("--interval", type=float, default=RELOAD_POLL_SECONDS, help="Seconds between polls")
+    args = parser.parse_args(argv)
+
+    engine = KeyIntelEngine(args.db)
+    for make, error in engine.load_errors.items():
+        print(f"{make}: {error}", file=sys.stderr)
+
+    def report(result):
+        print(time.strftime("%H:%M:%S"), describe(result), flush=True)
+        for warning in result["warnings"]:
+            print(f"    {warning}", flush=True)
+
+    watcher = BrandWatcher(engine, args.interval, on_reload=report).start()
+    print(f"Watching {', '.join(BRAND_FILES.values())} in {args.db}", file=sys.stderr)
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        watcher.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,379 @@
+"""
+CyberNinja Luxury Key Intelligence - Brand File Schema
+Checks brand files against the record schema and compiles every record
+into a normalized form with all defaults filled in, so the engine builds
+its VehicleRecords without any per-field fallbacks. The engine runs the
+check on every brand file it parses and refuses a file with errors;
+this CLI reports the same problems, with line numbers, before a file ships.
+
+    python keyintel_schema.py --db data              # lint every brand file
+    python keyintel_schema.py --db data --strict     # warnings fail the run too
+    python keyintel_schema.py --db data --compiled compiled.json
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+from bisect import bisect_left
+from json.decoder import JSONArray, JSONObject
+from json.scanner import py_make_scanner
+
+from keyintel_brands import BRAND_FILES, ROOT_KEYS
+
+# Key status codes used throughout the brand databases
+KEY_STATUSES = ("has_key", "one_key", "akl")
+
+# Known values of the low-cardinality record fields. Every string placed in
+# a VehicleRecord is interned, so equal values share one object.
+RISK_LEVELS = tuple(map(sys.intern, ("Low", "Medium", "Medium-High", "High", "Very High", "Unknown")))
+AKL_SUPPORT = tuple(map(sys.intern, ("Yes", "Limited", "Very Limited", "No", "Unknown")))
+
+# xhorse_tool_support flag -> tool_reference block it points at
+TOOL_REFERENCE_FLAGS = {"mlb_tool": "xhorse_mlb_tool", "mqb_adapter": "xhorse_mqb_adapter"}
+
+YEAR_RANGE_RE = re.compile(r"\d{4}-\d{4}")
+FIRST_YEAR, LAST_YEAR = 1980, 2099
+
+# Plain string fields of a record -> value shown when the field is absent
+STRING_FIELDS = {
+    "platform": "Unknown",
+    "immobilizer": "Unknown",
+    "key_type": "Unknown",
+    "key_blade": "Unknown",
+    "akl_supported": "Unknown",
+    "risk_level": "Unknown",
+    "notes": "No additional notes"
+}
+OBJECT_FIELDS = ("programming", "module_removal", "eeprom_info", "xhorse_tool_support")
+
+EEPROM_FIELDS = {"chip_type": str, "backup_method": str, "backup_required": bool, "warning": str}
+
+# mlb_tool / mqb_adapter are true/false, or one of these for partial support
+TOOL_SUPPORT_WORDS = ("Limited", "Verify")
+XHORSE_FIELDS = {
+    "mlb_tool": None, "mqb_adapter": None, "recommended_tool": str, "workflow": str,
+    "notes": str, "mlb_notes": str, "adapter_notes": str, "wiring_required": str,
+    "no_vehicle_needed": bool, "key_types": list
+}
+
+TYPE_NAMES = {str: "a string", bool: "true or false", list: "a list", dict: "an object"}
+
+
+def parse_year_range(year_range):
+    """Parse a "YYYY-YYYY" key into (start, end), raise ValueError if malformed"""
+    parts = year_range.split("-")
+    if len(parts) != 2:
+        raise ValueError(f"expected 'YYYY-YYYY', got {year_range!r}")
+    start, end = int(parts[0]), int(parts[1])
+    if start > end:
+        raise ValueError(f"start year after end year in {year_range!r}")
+    return start, end
+
+
+# =======================
+# Line-Aware JSON Loading
+# =======================
+class LocatedDict(dict):
+    """A decoded JSON object that knows the line it starts on and each key's line"""
+
+    __slots__ = ("line", "lines")
+
+
+def load_located(text):
+    """json.loads with a LocatedDict for every object
+
+    Returns (data, duplicates), where duplicates lists (line, message) for
+    keys repeated within one object (json.loads silently keeps the last one).
+    Uses the pure-Python scanner, so this is for linting, not the load path.
+    """
+    newlines = [m.start() for m in re.finditer("\n", text)]
+
+    def line_at(offset):
+        return bisect_left(newlines, offset) + 1
+
+    # One list of value offsets per object/array being decoded
+    frames = []
+    duplicates = []
+    decoder = json.JSONDecoder(object_pairs_hook=list)
+
+    def parse_object(s_and_end, strict, _scan_once, object_hook, object_pairs_hook, memo=None):
+        frames.append([])
+        try:
+            pairs, end = JSONObject(s_and_end, strict, scan_once, object_hook, object_pairs_hook, memo)
+        finally:
+            starts = frames.pop()
+        obj = LocatedDict()
+        obj.line = line_at(s_and_end[1] - 1)
+        obj.lines = {}
+        for (key, value), start in zip(pairs, starts):
+            line = line_at(start)
+            if key in obj:
+                duplicates.append((line, f"duplicate key {key!r} (first on line {obj.lines[key]})"))
+            else:
+                obj.lines[key] = line
+            obj[key] = value
+        return obj, end
+
+    def parse_array(s_and_end, _scan_once):
+        # Array items aren't object members; keep them out of the parent's frame
+        frames.append([])
+        try:
+            return JSONArray(s_and_end, scan_once)
+        finally:
+            frames.pop()
+
+    decoder.parse_object = parse_object
+    decoder.parse_array = parse_array
+    scanner = py_make_scanner(decoder)
+
+    def scan_once(s, idx):
+        if frames:
+            frames[-1].append(idx)
+        return scanner(s, idx)
+
+    decoder.scan_once = scan_once
+    return decoder.decode(text), duplicates
+
+
+def line_of(obj, key=None):
+    """Line of obj (or of its member key) if it was loaded by load_located, else None"""
+    if not isinstance(obj, LocatedDict):
+        return None
+    return obj.lines.get(key, obj.line) if key is not None else obj.line
+
+
+# =======================
+# Schema Checks
+# =======================
+def check_brand(data, make, root_key):
+    """Validate a decoded brand file and compile its records
+
+    Returns (compiled, errors, warnings): compiled maps model -> year range
+    -> normalize_record(...) for every record; errors and warnings are
+    (line, message) pairs, with line None unless data came from load_located.
+    """
+    errors, warnings = [], []
+    if not isinstance(data, dict):
+        errors.append((1, "top level must be an object"))
+        return {}, errors, warnings
+
+    tools = data.get("tool_reference", {})
+    if not isinstance(tools, dict):
+        errors.append((line_of(data, "tool_reference"), "tool_reference must be an object"))
+        tools = {}
+    models = data.get(root_key)
+    if not isinstance(models, dict):
+        errors.append((line_of(data, root_key), f"missing '{root_key}' object"))
+        return {}, errors, warnings
+
+    compiled = {}
+    for model, model_data in models.items():
+        label = f"{make} {model}"
+        if not isinstance(model_data, dict):
+            errors.append((line_of(models, model), f"{label} must map year ranges to records"))
+            continue
+        compiled[model] = {}
+        spans = []
+        for year_range, info in model_data.items():
+            where = f"{label} {year_range}"
+            line = line_of(model_data, year_range)
+            if not isinstance(info, dict):
+                errors.append((line, f"{where} is not a record"))
+                continue
+            record_errors = len(errors)
+            span = check_year_range(year_range, label, line, errors)
+            check_record(info, where, tools, errors, warnings)
+            if len(errors) == record_errors:
+                compiled[model][year_range] = normalize_record(info)
+                spans.append((*span, year_range, line))
+
+        spans.sort()
+        for prev, cur in zip(spans, spans[1:]):
+            if cur[0] <= prev[1]:
+                warnings.append((cur[3], f"{label}: {prev[2]} overlaps {cur[2]}"))
+            elif cur[0] > prev[1] + 1:
+                warnings.append((cur[3], f"{label}: gap between {prev[2]} and {cur[2]}"))
+    return compiled, errors, warnings
+
+
+def check_year_range(year_range, label, line, errors):
+    """(start, end) of a year range key, or None after appending an error"""
+    if not YEAR_RANGE_RE.fullmatch(year_range):
+        errors.append((line, f"{label}: year range {year_range!r} is not 'YYYY-YYYY'"))
+        return None
+    start, end = int(year_range[:4]), int(year_range[5:])
+    if start > end:
+        errors.append((line, f"{label}: year range {year_range!r} starts after it ends"))
+    elif start < FIRST_YEAR or end > LAST_YEAR:
+        errors.append((line, f"{label}: year range {year_range!r} is outside {FIRST_YEAR}-{LAST_YEAR}"))
+    else:
+        return start, end
+    return None
+
+
+def check_record(info, where, tools, errors, warnings):
+    """Append (line, message) issues for one year-range record"""
+    def expect(obj, key, kind, label):
+        if not isinstance(obj[key], kind):
+            errors.append((line_of(obj, key), f"{where}: {label} must be {TYPE_NAMES[kind]}"))
+            return False
+        return True
+
+    for key in info:
+        if key not in STRING_FIELDS and key not in OBJECT_FIELDS:
+            warnings.append((line_of(info, key), f"{where}: unknown field {key!r}"))
+        elif key in STRING_FIELDS:
+            expect(info, key, str, key)
+        else:
+            expect(info, key, dict, key)
+
+    risk = info.get("risk_level")
+    if isinstance(risk, str) and risk not in RISK_LEVELS:
+        errors.append((line_of(info, "risk_level"),
+                       f"{where}: risk_level {risk!r} is not one of {', '.join(RISK_LEVELS)}"))
+    akl = info.get("akl_supported")
+    # Qualified values ("No (dealer required)") are fine as long as they lead with a known one
+    if isinstance(akl, str) and not akl.startswith(AKL_SUPPORT):
+        errors.append((line_of(info, "akl_supported"),
+                       f"{where}: akl_supported {akl!r} doesn't start with one of {', '.join(AKL_SUPPORT)}"))
+
+    for field, kind in (("programming", str), ("module_removal", bool)):
+        by_status = info.get(field)
+        if not isinstance(by_status, dict):
+            continue
+        for key_status in by_status:
+            if key_status not in KEY_STATUSES:
+                errors.append((line_of(by_status, key_status),
+                               f"{where}: unknown key status {key_status!r} in {field} "
+                               f"(expected {', '.join(KEY_STATUSES)})"))
+            else:
+                expect(by_status, key_status, kind, f"{field}.{key_status}")
+        missing = [key_status for key_status in KEY_STATUSES if key_status not in by_status]
+        if missing:
+            warnings.append((line_of(info, field), f"{where}: {field} has no {', '.join(missing)} entry"))
+
+    eeprom = info.get("eeprom_info")
+    if isinstance(eeprom, dict):
+        for key in eeprom:
+            if key not in EEPROM_FIELDS:
+                warnings.append((line_of(eeprom, key), f"{where}: unknown eeprom_info field {key!r}"))
+            else:
+                expect(eeprom, key, EEPROM_FIELDS[key], f"eeprom_info.{key}")
+
+    xhorse = info.get("xhorse_tool_support")
+    if isinstance(xhorse, dict):
+        for key in xhorse:
+            kind = XHORSE_FIELDS.get(key, False)
+            if kind is False:
+                warnings.append((line_of(xhorse, key), f"{where}: unknown xhorse_tool_support field {key!r}"))
+            elif kind is None:
+                value = xhorse[key]
+                if type(value) is not bool and value not in TOOL_SUPPORT_WORDS:
+                    errors.append((line_of(xhorse, key),
+                                   f"{where}: xhorse_tool_support.{key} must be true, false, "
+                                   f"or one of {', '.join(TOOL_SUPPORT_WORDS)}"))
+                elif value and TOOL_REFERENCE_FLAGS[key] not in tools:
+                    warnings.append((line_of(xhorse, key),
+                                     f"{where}: {key} is set but tool_reference has no "
+                                     f"{TOOL_REFERENCE_FLAGS[key]!r} block"))
+            elif expect(xhorse, key, kind, f"xhorse_tool_support.{key}") and kind is list:
+                if not all(isinstance(item, str) for item in xhorse[key]):
+                    errors.append((line_of(xhorse, key), f"{where}: xhorse_tool_support.{key} must list strings"))
+
+
+def normalize_record(info):
+    """A year-range record with every field present and defaulted
+
+    Key-status fields stay per status ({"has_key": ..., ...}); everything
+    else is already in the flat shape VehicleRecord holds.
+    """
+    programming = info.get("programming", {})
+    module_removal = info.get("module_removal", {})
+    eeprom_info = info.get("eeprom_info", {})
+    xhorse_info = info.get("xhorse_tool_support", {})
+    compiled = {field: info.get(field, default) for field, default in STRING_FIELDS.items()}
+    compiled.update({
+        "programming": {ks: programming.get(ks, "Unknown") for ks in KEY_STATUSES},
+        "module_removal": {ks: "Yes" if module_removal.get(ks, False) else "No" for ks in KEY_STATUSES},
+        "eeprom_chip": eeprom_info.get("chip_type", "N/A"),
+        "backup_method": eeprom_info.get("backup_method", "Standard OBD backup"),
+        "backup_required": eeprom_info.get("backup_required", False),
+        "backup_warning": eeprom_info.get("warning", ""),
+        # Xhorse tool support
+        "mlb_tool": xhorse_info.get("mlb_tool", False),
+        "mqb_adapter": xhorse_info.get("mqb_adapter", False),
+        "xhorse_notes": xhorse_info.get("mlb_notes", xhorse_info.get("adapter_notes", xhorse_info.get("notes", ""))),
+        "xhorse_workflow": xhorse_info.get("workflow", ""),
+        "recommended_tool": xhorse_info.get("recommended_tool", "")
+    })
+    return compiled
+
+
+# =======================
+# File Linting
+# =======================
+def lint_file(path, make, root_key=None):
+    """(compiled, errors, warnings) for one brand file, every issue with its line"""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            text = f.read()
+    except (OSError, UnicodeDecodeError) as e:
+        return {}, [(None, str(e))], []
+    try:
+        data, duplicates = load_located(text)
+    except json.JSONDecodeError as e:
+        return {}, [(e.lineno, f"column {e.colno}: {e.msg}")], []
+    compiled, errors, warnings = check_brand(data, make, root_key or ROOT_KEYS[make])
+    # A warning, not an error: the engine's json.load keeps the last copy as before
+    warnings = sorted(duplicates + warnings, key=issue_order)
+    return compiled, sorted(errors, key=issue_order), warnings
+
+
+def issue_order(issue):
+    return (issue[0] or 0, issue[1])
+
+
+def format_issue(filename, issue):
+    line, message = issue
+    return f"{filename}:{line}: {message}" if line else f"{filename}: {message}"
+
+
+# =======================
+# Main Entry Point
+# =======================
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check brand JSON files against the record schema")
+    parser.add_argument("--db", default="data", help="Brand database folder")
+    parser.add_argument("--make", action="append", choices=list(BRAND_FILES), help="Only this make (repeatable)")
+    parser.add_argument("--strict", action="store_true", help="Fail on warnings as well as errors")
+    parser.add_argument("--compiled", help="Write the normalized records ({make: {model: {year range: record}}}) here")
+    args = parser.parse_args(argv)
+
+    failed = False
+    compiled_brands = {}
+    for make in args.make or BRAND_FILES:
+        filename = BRAND_FILES[make]
+        path = os.path.join(args.db, filename)
+        if not os.path.exists(path):
+            continue
+        compiled, errors, warnings = lint_file(path, make)
+        for issue in errors:
+            print(format_issue(filename, issue) + " [error]")
+        for issue in warnings:
+            print(format_issue(filename, issue) + " [warning]")
+        records = sum(len(year_ranges) for year_ranges in compiled.values())
+        print(f"{filename}: {records} records, {len(errors)} error(s), {len(warnings)} warning(s)",
+              file=sys.stderr)
+        failed = failed or bool(errors) or (args.strict and bool(warnings))
+        compiled_brands[make] = compiled
+
+    if args.compiled:
+        with open(args.compiled, "w", encoding="utf-8") as f:
+            json.dump(compiled_brands, f, ensure_ascii=False, indent=1)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
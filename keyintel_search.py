@@ -0,0 +1,138 @@
+"""
+CyberNinja Luxury Key Intelligence - Search Index
+Inverted token index plus facet postings over every year-range record,
+so queries like "HU100R 95256" are set intersections instead of walks
+over the nested brand dicts.
+
+    python keyintel_search.py "HU100R 95256" --db data
+    python keyintel_search.py "bdc" --risk High --module-removal akl
+"""
+
+import argparse
+import re
+import sys
+
+# Record fields that feed the full-text index
+TEXT_FIELDS = ("platform", "immobilizer", "key_type", "key_blade", "notes")
+EEPROM_TEXT_FIELDS = ("chip_type",)
+
+TOKEN_RE = re.compile(r"[a-z0-9]+(?:[.+][a-z0-9]+)*\+?")
+
+
+def tokenize(text):
+    """Lowercase alphanumeric tokens; keeps "cas4+" and "id.4" whole"""
+    if not isinstance(text, str):
+        return []
+    return TOKEN_RE.findall(text.lower())
+
+
+class SearchIndex:
+    """Token and facet postings over (make, model, year_range) records"""
+
+    def __init__(self, year_index):
+        # doc id -> (make, model, year_range, start, end, info)
+        self.docs = []
+        self.postings = {}
+        self.facets = {}
+
+        for (make, model), index in year_index.items():
+            for start, end, (year_range, info) in zip(index.starts, index.ends, index.entries):
+                self._add(make, model, year_range, start, end, info)
+
+        # Freeze postings; queries only ever intersect them
+        self.postings = {token: frozenset(ids) for token, ids in self.postings.items()}
+        self.facets = {key: frozenset(ids) for key, ids in self.facets.items()}
+
+    def _add(self, make, model, year_range, start, end, info):
+        doc_id = len(self.docs)
+        self.docs.append((make, model, year_range, start, end, info))
+
+        tokens = set(tokenize(make)) | set(tokenize(model)) | {model.lower()}
+        for field in TEXT_FIELDS:
+            tokens.update(tokenize(info.get(field, "")))
+        eeprom_info = info.get("eeprom_info", {})
+        for field in EEPROM_TEXT_FIELDS:
+            tokens.update(tokenize(eeprom_info.get(field, "")))
+        for token in tokens:
+            self.postings.setdefault(token, set()).add(doc_id)
+
+        self._facet(("make", make.lower()), doc_id)
+        self._facet(("risk_level", str(info.get("risk_level", "Unknown")).lower()), doc_id)
+        self._facet(("akl_supported", str(info.get("akl_supported", "Unknown")).lower()), doc_id)
+        for key_status, removal in info.get("module_removal", {}).items():
+            if removal:
+                self._facet(("module_removal", key_status), doc_id)
+
+    def _facet(self, key, doc_id):
+        self.facets.setdefault(key, set()).add(doc_id)
+
+    def facet_values(self, name):
+        """Distinct values seen for a facet"""
+        return sorted(value for facet, value in self.facets if facet == name)
+
+    def search(self, query="", make=None, risk_level=None, akl_supported=None,
+               module_removal=None, limit=None):
+        """Records matching every query token and every given facet
+
+        module_removal is a key status ("has_key", "one_key", "akl"): only
+        records that need module removal for that status match.
+        Returns (make, model, year_range, start, end, info) tuples.
+        """
+        sets = []
+        for token in set(tokenize(query)):
+            ids = self.postings.get(token)
+            if ids is None:
+                return []
+            sets.append(ids)
+        for name, value in (("make", make), ("risk_level", risk_level),
+                            ("akl_supported", akl_supported), ("module_removal", module_removal)):
+            if value:
+                ids = self.facets.get((name, value.lower()))
+                if ids is None:
+                    return []
+                sets.append(ids)
+
+        if not sets:
+            hits = range(len(self.docs))
+        else:
+            sets.sort(key=len)
+            hits = set(sets[0])
+            for ids in sets[1:]:
+                hits &= ids
+                if not hits:
+                    return []
+            hits = sorted(hits)
+
+        if limit is not None:
+            hits = hits[:limit]
+        return [self.docs[i] for i in hits]
+
+
+# =======================
+# Main Entry Point
+# =======================
+def main(argv=None):
+    from keyintel_engine import KeyIntelEngine, DEFAULT_DB_FOLDER
+
+    parser = argparse.ArgumentParser(description="Search the brand databases")
+    parser.add_argument("query", nargs="?", default="", help='Free text, e.g. "HU100R 95256"')
+    parser.add_argument("--db", default=DEFAULT_DB_FOLDER, help="Brand database folder")
+    parser.add_argument("--make")
+    parser.add_argument("--risk", dest="risk_level")
+    parser.add_argument("--akl", dest="akl_supported")
+    parser.add_argument("--module-removal", choices=["has_key", "one_key", "akl"])
+    args = parser.parse_args(argv)
+
+    engine = KeyIntelEngine(args.db)
+    hits = engine.search(args.query, make=args.make, risk_level=args.risk_level,
+                         akl_supported=args.akl_supported, module_removal=args.module_removal)
+    for make, model, year_range, _start, _end, info in hits:
+        chip = info.get("eeprom_info", {}).get("chip_type", "N/A")
+        print(f"{make} {model} {year_range}: {info.get('platform', '?')} | "
+              f"{info.get('key_blade', '?')} | {chip} | risk {info.get('risk_level', '?')}")
+    print(f"{len(hits)} match(es)", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,352 @@
+"""
+CyberNinja Luxury Key Intelligence - HTTP Lookup Service
+Serve VIN decode, vehicle resolve, model lists and search to other shop
+systems over plain HTTP/1.1 (keep-alive), from one loaded copy of the data.
+
+    python keyintel_server.py --db data --port 8765 [--watch]
+
+    GET  /health
+    GET  /decode?vin=WBA5R1C05LFH12345
+    GET  /resolve?make=BMW&model=X5&year=2020&key_status=akl
+    GET  /models?make=Audi
+    GET  /search?q=HU100R+95256&risk=High&akl=Limited&module_removal=akl&limit=20
+    POST /batch   {"rows": [{"vin": "...", "model": "X5"}, ...]}  or  {"vins": [...]}
+
+GET responses carry an ETag tied to the database version, so clients can
+revalidate with If-None-Match and get 304 until the data changes. With
+--watch, edited brand files are hot-reloaded and /health lists recent reloads.
+"""
+
+import argparse
+import hashlib
+import json
+import sys
+import threading
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from keyintel_batch import resolve_row
+from keyintel_engine import create_engine, BACKENDS, DEFAULT_DB_FOLDER, KEY_STATUSES
+from keyintel_snapshot import source_fingerprint
+import keyintel_trace as trace
+
+DEFAULT_PORT = 8765
+RESOLVE_CACHE_SIZE = 10000
+BATCH_MAX_ROWS = 10000
+MAX_BODY_BYTES = 8 * 1024 * 1024
+
+
+def database_version(db_folder):
+    """Short content hash over every brand source file"""
+    h = hashlib.sha256()
+    for filename, (_size, _mtime, digest) in sorted(source_fingerprint(db_folder).items()):
+        h.update(f"{filename}:{digest};".encode("utf-8"))
+    return h.hexdigest()[:16]
+
+
+class LRUCache:
+    """Thread-safe LRU with hit/miss counters"""
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_compute(self, key, compute):
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return self._data[key]
+            self.misses += 1
+        value = compute()
+        with self._lock:
+            self._data[key] = value
+            if len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self):
+        with self._lock:
+            return {"size": len(self._data), "maxsize": self.maxsize,
+                    "hits": self.hits, "misses": self.misses}
+
+
+class KeyIntelService:
+    """Engine facade shared by every request thread, with a resolve cache"""
+
+    def __init__(self, engine, version):
+        self.engine = engine
+        self.version = version
+        self.cache = LRUCache(RESOLVE_CACHE_SIZE)
+        self.watcher = None
+
+    def on_reload(self, result):
+        """Watcher callback: a brand was swapped, so cached answers and ETags are stale
+
+        Cache keys carry the version, so a lookup that started before the
+        reload and finishes after the clear can't put a stale answer back.
+        """
+        if result["ok"]:
+            self.version = database_version(self.engine.db_folder)
+            self.cache.clear()
+
+    def validate_vin(self, vin):
+        return self.engine.validate_vin(vin)
+
+    def resolve_vehicle(self, make, model, year, key_status):
+        return self.cache.get_or_compute(
+            (self.version, make, model, year, key_status),
+            lambda: self.engine.resolve_vehicle(make, model, year, key_status)
+        )
+
+    def get_models_for_make(self, make):
+        return self.engine.get_models_for_make(make)
+
+    def search(self, query, **facets):
+        return self.engine.search(query, **facets)
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+# =======================
+# Request Handling
+# =======================
+class KeyIntelHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server_version = "KeyIntel/1.0"
+    service = None  # Set by make_server
+    quiet = True
+
+    def log_message(self, format, *args):
+        if not self.quiet:
+            super().log_message(format, *args)
+
+    def send_json(self, status, payload, etag=None):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        if etag:
+            self.send_header("ETag", etag)
+            self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_internal_error(self, error):
+        """Answer 500 instead of dropping a keep-alive connection on a bug"""
+        # Logged even in quiet mode, unlike ordinary request lines
+        super().log_message("%s %s failed: %r", self.command, self.path, error)
+        self.send_json(500, {"error": "internal server error"})
+
+    def send_not_modified(self, etag):
+        self.send_response(304)
+        self.send_header("ETag", etag)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        params = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        route = GET_ROUTES.get(url.path.rstrip("/") or "/")
+        if route is None:
+            self.send_json(404, {"error": f"unknown endpoint {url.path}"})
+            return
+
+        etag = f'"{self.service.version}"' if route is not handle_health else None
+        if etag and etag in [t.strip() for t in self.headers.get("If-None-Match", "").split(",")]:
+            self.send_not_modified(etag)
+            return
+        try:
+            payload = route(self.service, params)
+        except HTTPError as e:
+            self.send_json(e.status, {"error": e.message})
+            return
+        except Exception as e:
+            self.send_internal_error(e)
+            return
+        self.send_json(200, payload, etag)
+
+    def do_POST(self):
+        url = urlsplit(self.path)
+        try:
+            length = int(self.headers.get("Content-Length", "0"))
+        except ValueError:
+            length = -1
+        if length < 0 or url.path.rstrip("/") != "/batch" or length == 0 or length > MAX_BODY_BYTES:
+            # The body stays unread, so it would be parsed as the next keep-alive request
+            self.close_connection = True
+            if length < 0:
+                self.send_json(400, {"error": "Content-Length must be a non-negative integer"})
+            elif url.path.rstrip("/") != "/batch":
+                self.send_json(404, {"error": f"unknown endpoint {url.path}"})
+            else:
+                self.send_json(400 if length == 0 else 413, {"error": "missing or oversized request body"})
+            return
+        try:
+            try:
+                body = json.loads(self.rfile.read(length))
+            except ValueError:
+                raise HTTPError(400, "body is not valid JSON")
+            self.send_json(200, handle_batch(self.service, body))
+        except HTTPError as e:
+            self.send_json(e.status, {"error": e.message})
+        except Exception as e:
+            self.send_internal_error(e)
+
+
+def _required(params, name):
+    value = params.get(name, "").strip()
+    if not value:
+        raise HTTPError(400, f"missing parameter '{name}'")
+    return value
+
+
+def handle_health(service, params):
+    health = {"status": "ok", "db_version": service.version, "resolve_cache": service.cache.stats()}
+    if service.watcher is not None:
+        health["reloads"] = list(service.watcher.history)
+        health["reload_errors"] = service.watcher.last_errors()
+    return health
+
+
+def handle_decode(service, params):
+    return service.validate_vin(_required(params, "vin"))
+
+
+def handle_resolve(service, params):
+    make = _required(params, "make")
+    model = _required(params, "model")
+    try:
+        year = int(_required(params, "year"))
+    except ValueError:
+        raise HTTPError(400, "year must be an integer")
+    key_status = params.get("key_status", "has_key")
+    if key_status not in KEY_STATUSES:
+        raise HTTPError(400, f"key_status must be one of {', '.join(KEY_STATUSES)}")
+    result = service.resolve_vehicle(make, model, year, key_status)
+    if result is None:
+        raise HTTPError(404, "no data for this vehicle configuration")
+    return result
+
+
+def handle_models(service, params):
+    return {"make": params.get("make", ""), "models": service.get_models_for_make(_required(params, "make"))}
+
+
+def handle_search(service, params):
+    try:
+        limit = int(params["limit"]) if params.get("limit") else None
+    except ValueError:
+        raise HTTPError(400, "limit must be an integer")
+    hits = service.search(
+        params.get("q", ""),
+        make=params.get("make"),
+        risk_level=params.get("risk"),
+        akl_supported=params.get("akl"),
+        module_removal=params.get("module_removal"),
+        limit=limit
+    )
+    return {"count": len(hits), "results": [
+        {"make": make, "model": model, "year_range": year_range, "year_start": start,
+         "year_end": end, "record": info}
+        for make, model, year_range, start, end, info in hits
+    ]}
+
+
+def handle_batch(service, body):
+    if isinstance(body, dict) and "rows" in body:
+        rows = body["rows"]
+    elif isinstance(body, dict) and "vins" in body:
+        if not isinstance(body["vins"], list):
+            raise HTTPError(400, "vins must be a list")
+        rows = [{"vin": vin} for vin in body["vins"]]
+    else:
+        raise HTTPError(400, 'expected {"rows": [...]} or {"vins": [...]}')
+    if not isinstance(rows, list):
+        raise HTTPError(400, "rows must be a list")
+    if len(rows) > BATCH_MAX_ROWS:
+        raise HTTPError(413, f"at most {BATCH_MAX_ROWS} rows per request")
+
+    results = []
+    for row in rows:
+        if isinstance(row, str):
+            row = {"vin": row}
+        if not isinstance(row, dict):
+            raise HTTPError(400, "each row must be a VIN string or an object")
+        results.append(resolve_row(service, {
+            "vin": str(row.get("vin", "")).strip(),
+            "model": str(row.get("model") or "").strip(),
+            "year": str(row.get("year") or "").strip()
+        }))
+    return {"db_version": service.version, "count": len(results), "results": results}
+
+
+GET_ROUTES = {
+    "/health": handle_health,
+    "/decode": handle_decode,
+    "/resolve": handle_resolve,
+    "/models": handle_models,
+    "/search": handle_search
+}
+
+
+def make_server(engine, host="127.0.0.1", port=DEFAULT_PORT, version=None, quiet=True):
+    """Build a threaded server bound to host:port (port 0 picks a free one)"""
+    service = KeyIntelService(engine, version or database_version(engine.db_folder))
+    handler = type("BoundKeyIntelHandler", (KeyIntelHandler,), {"service": service, "quiet": quiet})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    server.service = service
+    trace.register_counters("resolve_cache", service.cache.stats)
+    return server
+
+
+# =======================
+# Main Entry Point
+# =======================
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Local HTTP lookup service")
+    parser.add_argument("--db", default=DEFAULT_DB_FOLDER, help="Brand database folder")
+    parser.add_argument("--backend", choices=BACKENDS, default="json", help="Storage backend")
+    parser.add_argument("--host", default="127.0.0.1", help="Bind address (default: localhost only)")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--verbose", action="store_true", help="Log every request")
+    parser.add_argument("--watch", action="store_true", help="Hot-reload brand files when they change (json backend)")
+    args = parser.parse_args(argv)
+
+    server = make_server(create_engine(args.db, args.backend), args.host, args.port,
+                         quiet=not args.verbose)
+    if args.watch and hasattr(server.service.engine, "reload_brand"):
+        from keyintel_reload import BrandWatcher, describe
+
+        def on_reload(result):
+            server.service.on_reload(result)
+            print(describe(result), file=sys.stderr)
+
+        server.service.watcher = BrandWatcher(server.service.engine, on_reload=on_reload).start()
+    host, port = server.server_address[:2]
+    print(f"KeyIntel service on http://{host}:{port} (db {server.service.version})", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,194 @@
+"""
+CyberNinja Luxury Key Intelligence - Database Snapshot
+Compile the brand JSON files into one binary snapshot with the year-range
+indexes already built, so startup is a single bulk read instead of four
+JSON parses.
+
+    python keyintel_snapshot.py --db data          # build (skipped if up to date)
+    python keyintel_snapshot.py --db data --force  # always rebuild
+    python keyintel_snapshot.py --db data --matrix # also precompute every menu combination
+
+Search postings and parts reverse maps are stored too, so nothing is re-indexed at startup.
+
+The snapshot is a pickle and is only ever read from the local database
+folder. Never load a snapshot from an untrusted source.
+"""
+
+import argparse
+import hashlib
+import os
+import pickle
+import sys
+import time
+
+from keyintel_brands import BRAND_FILES, REGISTRY_DIGEST
+
+SNAPSHOT_FILENAME = "keyintel_db.snapshot"
+SNAPSHOT_VERSION = 7
+
+# Brand files compiled into the snapshot
+SOURCE_FILES = tuple(BRAND_FILES.values())
+
+
+def snapshot_path(db_folder):
+    return os.path.join(db_folder, SNAPSHOT_FILENAME)
+
+
+def file_sha256(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 16), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def source_fingerprint(db_folder):
+    """{filename: (size, mtime_ns, sha256)} for every present source file"""
+    sources = {}
+    for filename in SOURCE_FILES:
+        path = os.path.join(db_folder, filename)
+        if os.path.exists(path):
+            st = os.stat(path)
+            sources[filename] = (st.st_size, st.st_mtime_ns, file_sha256(path))
+    return sources
+
+
+def _current_sources(db_folder, recorded):
+    """recorded with refreshed stats if every source is unchanged, else None
+
+    Stat check first; the content hash is only computed for files whose
+    stat moved (e.g. after a checkout or copy).
+    """
+    present = [f for f in SOURCE_FILES if os.path.exists(os.path.join(db_folder, f))]
+    if set(present) != set(recorded):
+        return None
+    current = dict(recorded)
+    for filename in present:
+        path = os.path.join(db_folder, filename)
+        size, mtime_ns, digest = recorded[filename]
+        st = os.stat(path)
+        if st.st_size == size and st.st_mtime_ns == mtime_ns:
+            continue
+        if st.st_size != size or file_sha256(path) != digest:
+            return None
+        current[filename] = (st.st_size, st.st_mtime_ns, digest)
+    return current
+
+
+def read_snapshot(path):
+    """Bulk-read a snapshot file, return its payload dict or None"""
+    try:
+        with open(path, "rb") as f:
+            payload = pickle.loads(f.read())
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+        return None
+    if not isinstance(payload, dict) or payload.get("version") != SNAPSHOT_VERSION:
+        return None
+    # Built against a different brands.json: makes, files or root keys may differ
+    if payload.get("registry") != REGISTRY_DIGEST:
+        return None
+    return payload
+
+
+def load_snapshot(db_folder):
+    """Return the snapshot payload if it exists and matches the sources, else None"""
+    payload = read_snapshot(snapshot_path(db_folder))
+    if payload is None:
+        return None
+    sources = _current_sources(db_folder, payload["sources"])
+    if sources is None:
+        return None
+    if sources != payload["sources"]:
+        # Same content, new mtime: record it so later starts skip the hash
+        payload["sources"] = sources
+        try:
+            _write_payload(snapshot_path(db_folder), payload)
+        except OSError:
+            pass  # Read-only database folder: hash again next start
+    return payload
+
+
+def build_snapshot(db_folder, force=False, matrix=False):
+    """Compile the brand files into a snapshot. Returns True if a file was written.
+
+    matrix=True also stores the precomputed resolution matrix. Raises
+    BrandLoadError, and writes nothing, if any brand file fails to load:
+    a snapshot would otherwise serve that brand as empty with no error.
+    """
+    # Imported here: the engine itself imports this module to read snapshots
+    from keyintel_engine import BrandLoadError, KeyIntelEngine
+
+    path = snapshot_path(db_folder)
+    sources = source_fingerprint(db_folder)
+    if not force:
+        existing = read_snapshot(path)
+        if existing is not None:
+            old = {f: v[2] for f, v in existing["sources"].items()}
+            new = {f: v[2] for f, v in sources.items()}
+            if old == new and (existing.get("matrix") is not None or not matrix):
+                if existing["sources"] != sources:
+                    # Same content, new mtimes: refresh them so startup skips the hash
+                    existing["sources"] = sources
+                    _write_payload(path, existing)
+                return False
+
+    engine = KeyIntelEngine(db_folder, use_snapshot=False, lazy=False, matrix=matrix)
+    if engine.load_errors:
+        raise BrandLoadError("\n".join(engine.load_errors.values()))
+    year_index = engine.ordered_year_index()
+    payload = {
+        "version": SNAPSHOT_VERSION,
+        "registry": REGISTRY_DIGEST,
+        "sources": sources,
+        "brands": {
+            make: {"data": engine.brand_data(make), "tools": engine.tool_references(make)}
+            for make in BRAND_FILES
+        },
+        "manifest": dict(engine.manifest),
+        "year_index": year_index,
+        "search_index": engine.search_index,
+        "parts_index": engine.parts_index,
+        "warnings_by_make": engine.warnings_by_make(),
+        "matrix": engine.matrix
+    }
+
+    _write_payload(path, payload)
+    return True
+
+
+def _write_payload(path, payload):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        pickle.dump(payload, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, path)
+
+
+# =======================
+# Main Entry Point
+# =======================
+def main(argv=None):
+    from keyintel_engine import BrandLoadError, DEFAULT_DB_FOLDER
+
+    parser = argparse.ArgumentParser(description="Compile brand databases into a binary snapshot")
+    parser.add_argument("--db", default=DEFAULT_DB_FOLDER, help="Brand database folder")
+    parser.add_argument("--force", action="store_true", help="Rebuild even if sources are unchanged")
+    parser.add_argument("--matrix", action="store_true", help="Include the precomputed resolution matrix")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    try:
+        written = build_snapshot(args.db, force=args.force, matrix=args.matrix)
+    except BrandLoadError as e:
+        print(f"Snapshot not written:\n{e}", file=sys.stderr)
+        return 1
+    elapsed = time.perf_counter() - start
+    path = snapshot_path(args.db)
+    if written:
+        print(f"Snapshot written: {path} ({os.path.getsize(path):,} bytes, {elapsed:.3f}s)")
+    else:
+        print(f"Snapshot up to date: {path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,331 @@
+"""
+CyberNinja Luxury Key Intelligence - SQLite Backend
+Optional storage backend: the brand JSON files are imported once into an
+indexed SQLite file, and lookups run as indexed queries over a pool of
+read-only connections instead of holding every brand in Python dicts.
+
+    python keyintel_sqlite.py --db data          # import JSON -> data/keyintel.sqlite
+    KEYINTEL_BACKEND=sqlite python CyberNinja_LuxuryKeyIntel.py
+    python keyintel_batch.py vins.csv --backend sqlite
+"""
+
+import argparse
+import json
+import os
+import queue
+import sqlite3
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+from keyintel_engine import BRAND_FILES, DEFAULT_DB_FOLDER, BrandLoadError, KEY_STATUSES, build_record
+from keyintel_format import format_result
+from keyintel_parts import PART_FIELDS, record_parts
+from keyintel_search import TEXT_FIELDS, tokenize
+from keyintel_typeahead import TypeAhead
+import keyintel_trace as trace
+from keyintel_vin import decode_vin
+
+SQLITE_FILENAME = "keyintel.sqlite"
+POOL_SIZE = 4
+
+SCHEMA = """
+CREATE TABLE vehicles (
+    id INTEGER PRIMARY KEY,
+    make TEXT NOT NULL,
+    model TEXT NOT NULL,
+    year_range TEXT NOT NULL,
+    year_start INTEGER NOT NULL,
+    year_end INTEGER NOT NULL,
+    key_blade TEXT,
+    chip_type TEXT,
+    risk_level TEXT,
+    akl_supported TEXT,
+    removal_has_key INTEGER NOT NULL,
+    removal_one_key INTEGER NOT NULL,
+    removal_akl INTEGER NOT NULL,
+    search_text TEXT NOT NULL,
+    record_json TEXT NOT NULL
+);
+CREATE INDEX idx_vehicles_lookup ON vehicles (make, model, year_start, year_end);
+CREATE INDEX idx_vehicles_key_blade ON vehicles (key_blade);
+CREATE INDEX idx_vehicles_chip_type ON vehicles (chip_type);
+
+CREATE TABLE parts (
+    field TEXT NOT NULL,
+    value TEXT NOT NULL COLLATE NOCASE,
+    vehicle_id INTEGER NOT NULL REFERENCES vehicles (id)
+);
+CREATE INDEX idx_parts_value ON parts (field, value);
+
+CREATE TABLE tool_reference (
+    make TEXT NOT NULL,
+    name TEXT NOT NULL,
+    record_json TEXT NOT NULL,
+    PRIMARY KEY (make, name)
+);
+"""
+
+
+def sqlite_path(db_folder):
+    return os.path.join(db_folder, SQLITE_FILENAME)
+
+
+# =======================
+# Import
+# =======================
+def import_json(db_folder, out_path=None):
+    """Import the brand JSON files into a fresh SQLite database, return its path
+
+    Raises BrandLoadError, leaving any existing database alone, if a brand
+    file fails to load.
+    """
+    from keyintel_engine import KeyIntelEngine
+
+    out_path = out_path or sqlite_path(db_folder)
+    engine = KeyIntelEngine(db_folder, use_snapshot=False, lazy=False)
+    if engine.load_errors:
+        raise BrandLoadError("\n".join(engine.load_errors.values()))
+
+    tmp_path = out_path + ".tmp"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+    conn = sqlite3.connect(tmp_path)
+    try:
+        conn.executescript(SCHEMA)
+        for (make, model), index in engine.ordered_year_index().items():
+            for start, end, (year_range, info) in zip(index.starts, index.ends, index.entries):
+                removal = info.get("module_removal", {})
+                eeprom_info = info.get("eeprom_info", {})
+                tokens = set(tokenize(make)) | set(tokenize(model)) | {model.lower()}
+                for field in TEXT_FIELDS:
+                    tokens.update(tokenize(info.get(field, "")))
+                tokens.update(tokenize(eeprom_info.get("chip_type", "")))
+                cur = conn.execute(
+                    "INSERT INTO vehicles (make, model, year_range, year_start, year_end, key_blade,"
+                    " chip_type, risk_level, akl_supported, removal_has_key, removal_one_key,"
+                    " removal_akl, search_text, record_json)"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (make, model, year_range, start, end, info.get("key_blade"),
+                     eeprom_info.get("chip_type"),
+                     str(info.get("risk_level", "Unknown")).lower(),
+                     str(info.get("akl_supported", "Unknown")).lower(),
+                     int(bool(removal.get("has_key"))), int(bool(removal.get("one_key"))),
+                     int(bool(removal.get("akl"))),
+                     " " + " ".join(sorted(tokens)) + " ",
+                     json.dumps(info, ensure_ascii=False))
+                )
+                vehicle_id = cur.lastrowid
+                conn.executemany(
+                    "INSERT INTO parts (field, value, vehicle_id) VALUES (?, ?, ?)",
+                    [(field, value, vehicle_id)
+                     for field, values in record_parts(info).items() for value in values]
+                )
+
+        for make in BRAND_FILES:
+            for name, record in engine.tool_references(make).items():
+                conn.execute("INSERT INTO tool_reference (make, name, record_json) VALUES (?, ?, ?)",
+                             (make, name, json.dumps(record, ensure_ascii=False)))
+        conn.commit()
+        conn.execute("ANALYZE")
+    finally:
+        conn.close()
+    os.replace(tmp_path, out_path)
+    return out_path
+
+
+# =======================
+# Connection Pool
+# =======================
+class ConnectionPool:
+    """Fixed-size pool of read-only connections, safe to share between threads"""
+
+    def __init__(self, path, size=POOL_SIZE):
+        self.uri = Path(path).resolve().as_uri() + "?mode=ro"
+        self.size = size
+        self._idle = queue.LifoQueue()
+        self._created = 0
+        self._lock = threading.Lock()
+
+    def _open(self):
+        conn = sqlite3.connect(self.uri, uri=True, check_same_thread=False)
+        conn.execute("PRAGMA query_only = ON")
+        return conn
+
+    @contextmanager
+    def connection(self):
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                create = self._created < self.size
+                if create:
+                    self._created += 1
+            conn = self._open() if create else self._idle.get()
+        try:
+            yield conn
+        finally:
+            self._idle.put(conn)
+
+    def close(self):
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+
+
+# =======================
+# Engine
+# =======================
+class SqliteEngine:
+    """Drop-in for KeyIntelEngine that queries the imported SQLite file"""
+
+    # Connections must not cross a fork; workers open their own
+    fork_safe = False
+
+    def __init__(self, db_folder=DEFAULT_DB_FOLDER, path=None, pool_size=POOL_SIZE):
+        self.db_folder = db_folder
+        self.path = path or sqlite_path(db_folder)
+        if not os.path.exists(self.path):
+            raise FileNotFoundError(
+                f"{self.path} not found - run 'python keyintel_sqlite.py --db {db_folder}' first"
+            )
+        self.pool = ConnectionPool(self.path, pool_size)
+        self.index_warnings = []
+        self._typeahead = None
+
+    def close(self):
+        self.pool.close()
+
+    def get_models_for_make(self, make):
+        """Get available models for a make"""
+        with self.pool.connection() as conn:
+            rows = conn.execute(
+                "SELECT DISTINCT model FROM vehicles WHERE make = ? ORDER BY model", (make,)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def model_counts(self):
+        """Number of models per make, for the stats panel"""
+        counts = dict.fromkeys(BRAND_FILES, 0)
+        with self.pool.connection() as conn:
+            for make, count in conn.execute(
+                    "SELECT make, COUNT(DISTINCT model) FROM vehicles GROUP BY make"):
+                counts[make] = count
+        return counts
+
+    @trace.traced("resolve_vehicle")
+    def resolve_vehicle(self, make, model, year, key_status):
+        """Resolve vehicle data from database"""
+        with self.pool.connection() as conn:
+            row = conn.execute(
+                "SELECT year_range, record_json FROM vehicles"
+                " WHERE make = ? AND model = ? AND year_start <= ? AND year_end >= ?"
+                " ORDER BY year_start DESC LIMIT 1",
+                (make, model, year, year)
+            ).fetchone()
+        if row is None:
+            return None
+        return build_record(json.loads(row[1]), row[0], key_status)
+
+    def resolve_display(self, make, model, year, key_status):
+        """(record, format_result(record)) or None"""
+        record = self.resolve_vehicle(make, model, year, key_status)
+        return (record, format_result(record)) if record else None
+
+    def validate_vin(self, vin):
+        """Validate VIN and extract info"""
+        return decode_vin(vin)
+
+    def search(self, query="", make=None, risk_level=None, akl_supported=None,
+               module_removal=None, limit=None):
+        """Same contract as SearchIndex.search"""
+        where, params = [], []
+        for token in sorted(set(tokenize(query))):
+            where.append("search_text LIKE ? ESCAPE '\\'")
+            escaped = token.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+            params.append(f"% {escaped} %")
+        if make:
+            where.append("make = ? COLLATE NOCASE")
+            params.append(make)
+        if risk_level:
+            where.append("risk_level = ?")
+            params.append(risk_level.lower())
+        if akl_supported:
+            where.append("akl_supported = ?")
+            params.append(akl_supported.lower())
+        if module_removal:
+            if module_removal not in KEY_STATUSES:
+                return []
+            where.append(f"removal_{module_removal} = 1")
+
+        sql = "SELECT make, model, year_range, year_start, year_end, record_json FROM vehicles"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY id"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        with self.pool.connection() as conn:
+            rows = conn.execute(sql, params).fetchall()
+        return [(mk, model, yr, start, end, json.loads(rec)) for mk, model, yr, start, end, rec in rows]
+
+    @property
+    def typeahead(self):
+        """Type-ahead index, built in memory from one scan of the vehicles table"""
+        if self._typeahead is None:
+            with self.pool.connection() as conn:
+                rows = conn.execute(
+                    "SELECT make, model, year_range, year_start, year_end, record_json FROM vehicles ORDER BY id"
+                ).fetchall()
+            self._typeahead = TypeAhead(
+                (mk, model, yr, start, end, json.loads(rec).get("platform", ""))
+                for mk, model, yr, start, end, rec in rows
+            )
+        return self._typeahead
+
+    def vehicles_using(self, field, value):
+        """(make, model, year_range) for every record using a key blade, immobilizer or chip"""
+        if field not in PART_FIELDS:
+            return []
+        with self.pool.connection() as conn:
+            rows = conn.execute(
+                "SELECT v.make, v.model, v.year_range FROM parts p JOIN vehicles v ON v.id = p.vehicle_id"
+                " WHERE p.field = ? AND p.value = ? ORDER BY v.id",
+                (field, value)
+            ).fetchall()
+        return [tuple(row) for row in rows]
+
+    def tool_reference(self, make, name):
+        """Tool reference block (e.g. xhorse_mlb_tool) for a make, or None"""
+        with self.pool.connection() as conn:
+            row = conn.execute("SELECT record_json FROM tool_reference WHERE make = ? AND name = ?",
+                               (make, name)).fetchone()
+        return json.loads(row[0]) if row else None
+
+
+# =======================
+# Main Entry Point
+# =======================
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Import brand JSON files into the SQLite backend")
+    parser.add_argument("--db", default=DEFAULT_DB_FOLDER, help="Brand database folder")
+    parser.add_argument("--out", help=f"SQLite file (default: <db>/{SQLITE_FILENAME})")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    try:
+        path = import_json(args.db, args.out)
+    except BrandLoadError as e:
+        print(f"Import failed:\n{e}", file=sys.stderr)
+        return 1
+    elapsed = time.perf_counter() - start
+    print(f"Imported into {path} ({os.path.getsize(path):,} bytes, {elapsed:.3f}s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,162 @@
+"""
+CyberNinja Luxury Key Intelligence - Opt-in Instrumentation
+Timing spans and cache counters for chasing lag reports on shop PCs.
+Off unless KEYINTEL_TRACE=1 is set before launch; when off, @traced hands
+back the undecorated function, so instrumented code runs exactly as before.
+
+    KEYINTEL_TRACE=1 python CyberNinja_LuxuryKeyIntel.py
+    KEYINTEL_TRACE=1 KEYINTEL_TRACE_OUT=trace.json KEYINTEL_TRACE_FORMAT=chrome python keyintel_batch.py vins.csv
+
+Chrome-format files open in chrome://tracing or https://ui.perfetto.dev.
+"""
+
+import atexit
+import json
+import os
+import threading
+import time
+from collections import deque
+from functools import wraps
+
+ENABLED = os.environ.get("KEYINTEL_TRACE", "").lower() in ("1", "true", "yes", "on")
+
+# Raw span events kept for trace export; per-name durations for percentiles
+MAX_EVENTS = 100000
+MAX_SAMPLES = 10000
+
+EXPORT_FORMATS = ("json", "chrome")
+
+_lock = threading.Lock()
+_events = deque(maxlen=MAX_EVENTS)
+_durations = {}
+_counters = {}
+# name -> callable returning {counter: value}, read at export time only
+_counter_sources = {}
+_origin_ns = time.perf_counter_ns()
+
+
+def traced(name):
+    """Decorator timing every call as a span named name (no-op when tracing is off)"""
+    def decorate(fn):
+        if not ENABLED:
+            return fn
+
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter_ns()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                record(name, start, time.perf_counter_ns() - start)
+        return wrapper
+    return decorate
+
+
+def record(name, start_ns, duration_ns):
+    with _lock:
+        _events.append((name, start_ns, duration_ns, threading.get_ident()))
+        samples = _durations.get(name)
+        if samples is None:
+            samples = _durations[name] = deque(maxlen=MAX_SAMPLES)
+        samples.append(duration_ns)
+
+
+def count(name, n=1):
+    """Bump a counter; callers guard with `if trace.ENABLED` on hot paths"""
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + n
+
+
+def register_counters(name, source):
+    """Counters someone else already keeps (e.g. an lru_cache), read on demand"""
+    _counter_sources[name] = source
+
+
+def reset():
+    with _lock:
+        _events.clear()
+        _durations.clear()
+        _counters.clear()
+
+
+def percentile(ordered, q):
+    if not ordered:
+        return 0
+    return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))]
+
+
+def counters():
+    with _lock:
+        values = dict(_counters)
+    for prefix, source in _counter_sources.items():
+        try:
+            for key, value in source().items():
+                values[f"{prefix}.{key}"] = value
+        except Exception:
+            continue
+    return values
+
+
+def summary():
+    """{span: {"count", "p50_ms", "p95_ms", "max_ms", "total_ms"}} over recent calls"""
+    with _lock:
+        samples = {name: sorted(durations) for name, durations in _durations.items()}
+    return {
+        name: {
+            "count": len(ordered),
+            "p50_ms": percentile(ordered, 0.50) / 1e6,
+            "p95_ms": percentile(ordered, 0.95) / 1e6,
+            "max_ms": ordered[-1] / 1e6,
+            "total_ms": sum(ordered) / 1e6
+        }
+        for name, ordered in sorted(samples.items())
+    }
+
+
+def export_json():
+    with _lock:
+        events = list(_events)
+    return {
+        "spans": summary(),
+        "counters": counters(),
+        "events": [
+            {"name": name, "start_ms": (start - _origin_ns) / 1e6, "duration_ms": dur / 1e6, "thread": tid}
+            for name, start, dur, tid in events
+        ]
+    }
+
+
+def export_chrome():
+    """Trace Event Format: complete ("X") events plus a final counter sample"""
+    pid = os.getpid()
+    with _lock:
+        events = list(_events)
+    trace = [
+        {"name": name, "ph": "X", "ts": (start - _origin_ns) / 1000, "dur": dur / 1000,
+         "pid": pid, "tid": tid, "cat": "keyintel"}
+        for name, start, dur, tid in events
+    ]
+    now_us = (time.perf_counter_ns() - _origin_ns) / 1000
+    for name, value in counters().items():
+        if isinstance(value, (int, float)):
+            trace.append({"name": name, "ph": "C", "ts": now_us, "pid": pid, "args": {"value": value}})
+    return {"traceEvents": trace, "displayTimeUnit": "ms"}
+
+
+def write(path, fmt="json"):
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"unknown trace format {fmt!r} (expected one of {', '.join(EXPORT_FORMATS)})")
+    payload = export_chrome() if fmt == "chrome" else export_json()
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(payload, f)
+    return path
+
+
+def _write_on_exit():
+    path = os.environ.get("KEYINTEL_TRACE_OUT")
+    if path:
+        write(path, os.environ.get("KEYINTEL_TRACE_FORMAT", "json"))
+
+
+if ENABLED:
+    atexit.register(_write_on_exit)
@@ -0,0 +1,138 @@
+"""
+CyberNinja Luxury Key Intelligence - Model Type-Ahead
+Prefix index over "make model platform years" for every year-range
+record, so typing "G05" or "X5 20" lands on a vehicle without scrolling
+the make and model dropdowns. Every prefix of every indexed token maps
+straight to its records, so a keystroke costs one dict hit per query
+token plus set intersections no larger than the current candidates; a
+TypeAheadSession narrows the previous keystroke's candidates instead of
+starting over while the user keeps typing forward.
+
+    python keyintel_typeahead.py "X5 20" --db data
+"""
+
+import argparse
+import heapq
+import sys
+
+from keyintel_brands import MAKE_ALIASES
+from keyintel_search import tokenize
+
+# Candidates listed per keystroke
+TYPEAHEAD_LIMIT = 15
+
+
+def year_tokens(start, end):
+    """Every year a range covers, so "20" / "2020" match by prefix like any other token"""
+    return [str(year) for year in range(start, end + 1)]
+
+
+class TypeAhead:
+    """Prefix -> record ids over (make, model, year_range, start, end, platform) rows"""
+
+    def __init__(self, rows):
+        # id -> (make, model, year_range, start, end, platform), in menu order
+        self.entries = []
+        prefixes = {}
+        aliases = {}
+        for alias, make in MAKE_ALIASES.items():
+            aliases.setdefault(make, []).append(alias)
+
+        for make, model, year_range, start, end, platform in rows:
+            entry_id = len(self.entries)
+            self.entries.append((make, model, year_range, start, end, platform))
+            tokens = set(tokenize(make)) | set(aliases.get(make, ()))
+            tokens.update(tokenize(model))
+            # "3 Series" also as "3series"
+            tokens.add("".join(tokenize(model)))
+            tokens.update(tokenize(platform))
+            tokens.update(year_tokens(start, end))
+            for token in tokens:
+                for i in range(1, len(token) + 1):
+                    prefixes.setdefault(token[:i], set()).add(entry_id)
+
+        self.prefixes = {prefix: frozenset(ids) for prefix, ids in prefixes.items()}
+        self.all_ids = frozenset(range(len(self.entries)))
+
+    def filter(self, query, candidates=None):
+        """Ids of records where every query token prefixes one of the record's tokens
+
+        candidates narrows an earlier result instead of starting from every
+        record; each intersection costs at most the size of the smaller set.
+        """
+        ids = self.all_ids if candidates is None else candidates
+        # Longest token first: usually the most selective
+        for token in sorted(set(tokenize(query)), key=len, reverse=True):
+            hits = self.prefixes.get(token)
+            if hits is None:
+                return frozenset()
+            ids = ids & hits
+            if not ids:
+                break
+        return ids
+
+    def results(self, ids, limit=TYPEAHEAD_LIMIT):
+        """The first limit matches in menu order"""
+        return [self.entries[i] for i in heapq.nsmallest(limit, ids)]
+
+    def session(self):
+        return TypeAheadSession(self)
+
+
+class TypeAheadSession:
+    """Per-entry-box state: the last query and the candidates it left"""
+
+    def __init__(self, index):
+        self.index = index
+        self.query = ""
+        self.candidates = index.all_ids
+
+    def update(self, text, limit=TYPEAHEAD_LIMIT):
+        """Matches for the entry box's current text"""
+        query = text.lower()
+        if query.startswith(self.query):
+            # Typing forward only ever narrows the match
+            self.candidates = self.index.filter(query, self.candidates)
+        else:
+            self.candidates = self.index.filter(query)
+        self.query = query
+        if not tokenize(query):
+            return []
+        return self.index.results(self.candidates, limit)
+
+
+def query_year(query, start, end):
+    """A full year typed in the query that falls inside start-end, or None"""
+    for token in tokenize(query):
+        if len(token) == 4 and token.isdigit() and start <= int(token) <= end:
+            return int(token)
+    return None
+
+
+# =======================
+# Main Entry Point
+# =======================
+def main(argv=None):
+    from keyintel_engine import create_engine, BACKENDS, DEFAULT_DB_FOLDER
+
+    parser = argparse.ArgumentParser(description="Type-ahead lookup over make, model, platform and years")
+    parser.add_argument("query", help='e.g. "G05" or "X5 20"')
+    parser.add_argument("--db", default=DEFAULT_DB_FOLDER, help="Brand database folder")
+    parser.add_argument("--backend", choices=BACKENDS, default="json")
+    parser.add_argument("--limit", type=int, default=TYPEAHEAD_LIMIT)
+    args = parser.parse_args(argv)
+
+    engine = create_engine(args.db, args.backend)
+    session = engine.typeahead.session()
+    hits = []
+    # Replay the query a keystroke at a time, as the entry box would
+    for end in range(1, len(args.query) + 1):
+        hits = session.update(args.query[:end], args.limit)
+    for make, model, year_range, _start, _end, platform in hits:
+        print(f"{make} {model} {year_range}: {platform}")
+    print(f"{len(session.candidates)} match(es)", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,88 @@
+"""
+CyberNinja Luxury Key Intelligence - VIN Decoder
+Module-level lookup tables and a memoized decoder shared by the GUI,
+batch mode and any other caller. No per-call table construction.
+"""
+
+import time
+from functools import lru_cache
+from types import MappingProxyType
+
+from keyintel_brands import WMI_INFO
+import keyintel_trace as trace
+
+
+# Position-10 model-year codes in cycle order. The sequence repeats every
+# 30 years (A = 1980 / 2010 / 2040 ...); I, O, Q, U, Z and 0 are never used.
+YEAR_CODE_SEQUENCE = "ABCDEFGHJKLMNPRSTVWXY123456789"
+YEAR_CYCLE_START = 1980
+
+# Latest model year a code may decode to. Vehicles are sold up to one
+# model year ahead, so anything later belongs to the previous cycle.
+LATEST_MODEL_YEAR = time.localtime().tm_year + 1
+
+
+def build_year_codes(latest_model_year=LATEST_MODEL_YEAR):
+    """Map every year code to the most recent year not after latest_model_year"""
+    codes = {}
+    for offset, code in enumerate(YEAR_CODE_SEQUENCE):
+        year = YEAR_CYCLE_START + offset
+        while year + 30 <= latest_model_year:
+            year += 30
+        codes[code] = year
+    return MappingProxyType(codes)
+
+
+YEAR_CODES = build_year_codes()
+
+INVALID_VIN_CHARS = frozenset("IOQ")
+
+VIN_CACHE_SIZE = 4096
+
+
+@lru_cache(maxsize=VIN_CACHE_SIZE)
+def _decode(vin):
+    if len(vin) != 17:
+        return {"valid": False, "message": f"Need 17 chars (got {len(vin)})"}
+
+    if not INVALID_VIN_CHARS.isdisjoint(vin):
+        invalid = [c for c in vin if c in INVALID_VIN_CHARS]
+        return {"valid": False, "message": f"Invalid: {', '.join(invalid)}"}
+
+    if not vin.isalnum():
+        return {"valid": False, "message": "Must be alphanumeric"}
+
+    manufacturer, make = WMI_INFO.get(vin[:3], ("Unknown", None))
+    return {
+        "valid": True,
+        "message": f"✓ {manufacturer}",
+        "manufacturer": manufacturer,
+        "year": YEAR_CODES.get(vin[9]),
+        "make": make
+    }
+
+
+def decode_vin(vin):
+    """Validate VIN and extract info"""
+    if not vin:
+        return {"valid": False, "message": ""}
+    # Copy so callers can't mutate the cached entry
+    return dict(_decode(vin.upper().strip()))
+
+
+def decode_vins(vins):
+    """Decode an iterable of VINs, yielding results in order"""
+    for vin in vins:
+        yield decode_vin(vin)
+
+
+def cache_info():
+    """LRU statistics for the decoder cache"""
+    return _decode.cache_info()
+
+
+trace.register_counters("vin_cache", lambda: cache_info()._asdict())
+
+
+def clear_cache():
+    _decode.cache_clear()